@@ -12,6 +12,7 @@ st.markdown(
 )
 
 from utils.loader import load_json
+from utils.rollups import live_sales
 from utils.theme import apply_theme
 
 
@@ -28,7 +29,7 @@ apply_theme()
 if "auth" not in st.session_state:
     st.session_state["auth"] = False
 
-sales = load_json("sales.json")
+sales = live_sales(load_json("sales.json"))
 
 st.markdown(
     """
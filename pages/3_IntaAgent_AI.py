@@ -1,12 +1,24 @@
 import time
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from utils.alertrules import classify as classify_alerts
+from utils.anomaly import live_alerts
+from utils.figcache import cached_figure
+from utils.forecast import demand_forecast
+from utils.heatmap import WEEKDAY_LABELS, demand_heatmap
 from utils.loader import load_json
+from utils.movers import live_movers
 from utils.sidebar import render_sidebar
+from utils.sparkline import sparkline
 from utils.theme import apply_theme
+from utils.timebucket import HOURS, busy_hour_label, hour_label
+
+
+ALERT_ICONS = {"critical": "⚠️", "warning": "⚡", "info": "✅", None: "ℹ️"}
 
 
 def qx_card(title: str, body: str, severity: str | None = None) -> str:
@@ -23,6 +35,23 @@ def qx_card(title: str, body: str, severity: str | None = None) -> str:
     )
 
 
+def heatmap_figure(heatmap, heat_axes: dict):
+    fig_heat = px.imshow(
+        heatmap,
+        **heat_axes,
+        color_continuous_scale=["#0b1a2f", "#1B76FF", "#E0B455"],
+        labels={"color": "Demand Index"},
+        title="Qx™ Heatmap",
+    )
+    fig_heat.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=10, r=10, t=40, b=10),
+        font=dict(color="#E8EEF9"),
+    )
+    return fig_heat
+
+
 st.session_state["active_page"] = "Qx Intelligence"
 apply_theme()
 render_sidebar()
@@ -58,17 +87,8 @@ st.markdown(
 )
 
 # Smart Alerts
-severity_map = []
-for a in ai.get("alerts", []):
-    lower = a.lower()
-    if any(k in lower for k in ["low", "down", "below", "risk"]):
-        severity_map.append(("critical", "⚠️", a))
-    elif any(k in lower for k in ["increase", "spike", "up"]):
-        severity_map.append(("warning", "⚡", a))
-    elif any(k in lower for k in ["good", "strong", "healthy"]):
-        severity_map.append(("info", "✅", a))
-    else:
-        severity_map.append((None, "ℹ️", a))
+alerts = live_alerts(ai.get("alerts", []), [i["name"] for i in load_json("inventory.json").get("items", [])])
+severity_map = [(sev, ALERT_ICONS[sev], a) for sev, a in zip(classify_alerts(alerts), alerts)]
 
 st.markdown(
     """
@@ -105,30 +125,22 @@ st.markdown(
 )
 driver_cols = st.columns(3)
 for col, d in zip(driver_cols, drivers):
-    spark = px.line(y=[d["margin"] * 0.7, d["margin"] * 0.9, d["margin"]], height=100)
-    spark.update_traces(line=dict(color="#E0B455", width=3), marker=dict(size=4, color="#1B76FF"))
-    spark.update_layout(
-        margin=dict(l=10, r=10, t=10, b=10),
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-    )
     col.markdown(
         f"""
         <div class="glass animate-pop" style="padding:12px; min-height:140px;">
             <strong>{d['item']}</strong><br/>
             <span style="color:#cbd7f0;">Margin: {d['margin']*100:.0f}%</span><br/>
             <span style="color:#9fb0c7; font-size:12px;">High margin — recommended for evening upsells.</span>
+            {sparkline([d['margin'] * 0.7, d['margin'] * 0.9, d['margin']], height=48)}
         </div>
         """,
         unsafe_allow_html=True,
     )
-    col.plotly_chart(spark, use_container_width=True, config={"displayModeBar": False})
 
 # Fast vs Slow movers
-fast_movers = ai.get("fast_movers", [])
-slow_movers = ai.get("slow_movers", [])
+fast_movers, slow_movers = live_movers(
+    ai.get("fast_movers", []), ai.get("slow_movers", []), [p["name"] for p in load_json("products.json")]
+)
 fm_col, sm_col = st.columns(2)
 with fm_col:
     st.markdown(
@@ -146,13 +158,15 @@ with fm_col:
                 <strong>{f['item']}</strong><br/>
                 <span style="color:#cbd7f0;">{f.get('rate','3x faster than average')}</span>
                 <div style="margin-top:6px; height:8px; border-radius:8px; background:rgba(255,255,255,0.07); overflow:hidden;">
-                    <div style="width:90%; height:100%; background:#1B76FF;"></div>
+                    <div style="width:{f.get('bar', 90)}%; height:100%; background:#1B76FF;"></div>
                 </div>
                 <span style="color:#9fb0c7; font-size:12px;">Trend: ↑ accelerating</span>
             </div>
             """,
             unsafe_allow_html=True,
         )
+    if not fast_movers:
+        st.caption("No item is selling faster than usual right now.")
 with sm_col:
     st.markdown(
         """
@@ -169,25 +183,44 @@ with sm_col:
                 <strong>{s['item']}</strong><br/>
                 <span style="color:#cbd7f0;">{s['days_no_sale']} days without sale</span>
                 <div style="margin-top:6px; height:8px; border-radius:8px; background:rgba(255,255,255,0.07); overflow:hidden;">
-                    <div style="width:30%; height:100%; background:#E0B455;"></div>
+                    <div style="width:{s.get('bar', 30)}%; height:100%; background:#E0B455;"></div>
                 </div>
                 <span style="color:#9fb0c7; font-size:12px;">Trend: ↓ needs promo</span>
             </div>
             """,
             unsafe_allow_html=True,
         )
+    if not slow_movers:
+        st.caption("Every menu item has sold within the last day.")
 st.markdown("<div style='color:#9fb0c7; font-size:12px; margin-top:4px;'>Insights refreshed continuously by Qx™.</div>", unsafe_allow_html=True)
 
 # Demand prediction engine
 prediction = ai.get("prediction", {})
 heatmap = prediction.get("heatmap", [])
+heat_axes = {}
+busy_hour = busy_hour_label(prediction.get("next_busy_hour", "N/A"))
+expected_orders = prediction.get("expected_orders", "—")
+volume_note = "Projected volume"
+forecast = demand_forecast()
+if forecast is not None:
+    next_day = forecast["orders"][:HOURS]
+    busy_hour = hour_label(int((forecast["start"] + np.argmax(next_day)) % HOURS))
+    expected_orders = int(round(next_day.sum()))
+    volume_note = "Projected volume, next 24h"
+    heatmap = np.round(forecast["heatmap"], 1)
+    heat_axes = {"x": [hour_label(h) for h in range(24)], "y": WEEKDAY_LABELS}
+else:
+    live_heat = demand_heatmap()
+    if live_heat is not None:
+        heatmap = live_heat
+        heat_axes = {"x": [hour_label(h) for h in range(24)], "y": WEEKDAY_LABELS}
 pred_cols = st.columns([1, 1, 1.4])
 with pred_cols[0]:
     st.markdown(
         f"""
         <div class="glass animate-pop" style="padding:12px; border:1px solid rgba(27,118,255,0.4);">
             <div class="pill" style="background: rgba(27,118,255,0.14);">Next Busy Hour</div>
-            <h4 style="margin:6px 0;">{prediction.get('next_busy_hour','N/A')}</h4>
+            <h4 style="margin:6px 0;">{busy_hour}</h4>
             <span style="color:#9fb0c7; font-size:12px;">⏱ Clock-synced</span>
         </div>
         """,
@@ -198,27 +231,15 @@ with pred_cols[1]:
         f"""
         <div class="glass animate-pop" style="padding:12px; background: linear-gradient(135deg, rgba(27,118,255,0.22), rgba(224,180,85,0.18));">
             <div class="pill" style="background: rgba(224,180,85,0.14); color:#ffd78a;">Expected Orders</div>
-            <h3 style="margin:6px 0;">{prediction.get('expected_orders','—')}</h3>
-            <span style="color:#9fb0c7; font-size:12px;">Projected volume</span>
+            <h3 style="margin:6px 0;">{expected_orders}</h3>
+            <span style="color:#9fb0c7; font-size:12px;">{volume_note}</span>
         </div>
         """,
         unsafe_allow_html=True,
     )
 with pred_cols[2]:
-    if heatmap:
-        fig_heat = px.imshow(
-            heatmap,
-            color_continuous_scale=["#0b1a2f", "#1B76FF", "#E0B455"],
-            labels={"color": "Demand Index"},
-            title="Qx™ Heatmap",
-        )
-        fig_heat.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=10, r=10, t=40, b=10),
-            font=dict(color="#E8EEF9"),
-        )
-        st.plotly_chart(fig_heat, use_container_width=True)
+    if len(heatmap):
+        st.plotly_chart(cached_figure("ai.heatmap", heatmap_figure, heatmap, heat_axes), use_container_width=True)
 st.markdown("<p style='color:#9fb0c7; font-size:12px;'>Forecast produced using historical patterns + real-time signals (demo).</p>", unsafe_allow_html=True)
 
 # Qx Operational Feed
@@ -1,30 +1,216 @@
-import re
-from datetime import datetime
+from datetime import date
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-from utils.loader import load_json
+from utils.alertrules import item_mentions
+from utils.anomaly import live_alerts
+from utils.bom import live_stock
+from utils.depletion import depletion_forecast, hours_label
+from utils.figcache import cached_figure
+from utils.loader import load_frame, load_json
+from utils.pdfcache import lazy_pdf
+from utils.productstore import product_store
+from utils.reorder import reorder_plan, reorder_rows
+from utils.reports import supplier_pdf
 from utils.sidebar import render_sidebar
+from utils.stockstatus import STATUSES, classify
 from utils.theme import apply_theme
 
 
-def status_info(row):
-    ratio = row["stock"] / row["min"] if row["min"] else 1
-    if ratio < 1:
-        return "Critical", "rgba(255,77,77,0.35)", "#ff8c8c"
-    if ratio == 1:
-        return "Low", "rgba(224,180,85,0.35)", "#ffd78a"
-    return "OK", "rgba(78,204,163,0.35)", "#c3f3de"
+FORECAST_CARDS = 6
 
 
-def build_supplier_pdf(rows):
-    lines = ["Supplier Reorder List", f"Date: {datetime.now().strftime('%d %b %Y')}", ""]
-    for row in rows:
-        lines.append(f"{row['item']} — Order {row['amount']} — {row['reason']}")
-    return "\n".join(lines).encode("utf-8")
+def waste_figure(waste_df):
+    waste_fig = px.line(
+        waste_df,
+        x="day",
+        y="value",
+        title="Waste Trend (units)",
+        markers=True,
+        template="plotly_dark",
+    )
+    waste_fig.update_traces(line=dict(color="#1B76FF", width=3), marker=dict(size=8, color="#E0B455"))
+    waste_fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#E8EEF9"),
+        margin=dict(l=20, r=20, t=40, b=20),
+    )
+    return waste_fig
+
+
+def loss_figure(loss_breakdown):
+    loss_fig = px.bar(
+        loss_breakdown,
+        x="label",
+        y="value",
+        title="Loss Breakdown",
+        color="value",
+        color_continuous_scale=["#5FB1FF", "#1B76FF"],
+        template="plotly_dark",
+    )
+    loss_fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(color="#E8EEF9"),
+        margin=dict(l=20, r=20, t=40, b=20),
+        coloraxis_showscale=False,
+    )
+    return loss_fig
+
+
+GRID_PAGE_SIZES = (12, 24, 48)
+SEVERITY = {"Critical": 0, "Low": 1, "OK": 2}
+GRID_SORTS = {
+    "Urgency": (["severity", "pct", "name"], [True, True, True]),
+    "Name": (["name"], [True]),
+    "Stock (low first)": (["stock", "name"], [True, True]),
+    "Remaining %": (["pct", "name"], [True, True]),
+}
+
+
+def filter_items(items, statuses=(), category="All", supplier="All", search="", sort="Urgency"):
+    """Classified items matching every filter, sorted; vectorized masks, no row loop."""
+    mask = np.ones(len(items), dtype=bool)
+    if statuses:
+        mask &= items["status"].isin(statuses).to_numpy()
+    if category != "All" and "category" in items:
+        mask &= (items["category"] == category).to_numpy()
+    if supplier != "All" and "supplier" in items:
+        mask &= (items["supplier"] == supplier).to_numpy()
+    if search:
+        mask &= items["name"].str.contains(search, case=False, regex=False, na=False).to_numpy()
+    view = items[mask]
+    keys, ascending = GRID_SORTS[sort]
+    if "severity" in keys:
+        view = view.assign(severity=view["status"].map(SEVERITY))
+    return view.sort_values(keys, ascending=ascending, kind="stable")
+
+
+def item_card(row, notes):
+    status, bg, fg, pct, bar_color = row["status"], row["bg"], row["fg"], row["pct"], row["bar"]
+    ai_note = None
+    if status != "OK":
+        ai_note = notes.get(row["name"], "Demand trending up — reorder suggested.")
+    # One line per card: blank or indented lines would end the HTML block inside the grid's markdown.
+    html = f"""
+        <div class="glass animate-pop" style="padding:12px; border-left:4px solid {bar_color}; min-height:150px; transition: transform 0.2s ease, box-shadow 0.2s ease;">
+            <div style="display:flex; justify-content:space-between; align-items:center;">
+                <strong>{row['name']}</strong>
+                <span style="padding:4px 8px; border-radius:10px; background:{bg}; color:{fg}; font-weight:700;">{status}</span>
+            </div>
+            <div style="color:#9fb0c7; margin-top:6px;">Stock: {row['stock']} | Min: {row['min']}</div>
+            <div style="margin-top:8px; height:8px; border-radius:8px; background:rgba(255,255,255,0.07); overflow:hidden;">
+                <div style="width:{pct}%; height:100%; background:{bar_color};"></div>
+            </div>
+            <div style="color:#cbd7f0; margin-top:6px; font-size:12px;">Remaining: {pct}%</div>
+            {"<div style='color:#ff8c8c; margin-top:6px; font-size:12px;'>"+ai_note+"</div>" if ai_note else ""}
+        </div>
+    """
+    return "".join(line.strip() for line in html.splitlines())
+
+
+def _turn_page(step):
+    st.session_state["inv_page"] = st.session_state.get("inv_page", 1) + step
+
+
+@st.fragment
+def inventory_grid(items, ai):
+    """Filterable, sorted item cards; only the visible page is rendered, as one HTML block."""
+    choices = {
+        col: ["All", *sorted(items[col].dropna().astype(str).unique())] if col in items else ["All"]
+        for col in ("category", "supplier")
+    }
+    f = st.columns([2, 1.4, 1, 1, 1])
+    search = f[0].text_input("Search", key="inv_search", placeholder="Item name").strip()
+    statuses = f[1].multiselect("Status", STATUSES, key="inv_status")
+    category = f[2].selectbox("Category", choices["category"], key="inv_category")
+    supplier = f[3].selectbox("Supplier", choices["supplier"], key="inv_supplier")
+    sort = f[4].selectbox("Sort", list(GRID_SORTS), key="inv_sort")
+    size = st.session_state.get("inv_page_size", GRID_PAGE_SIZES[0])
+
+    view = filter_items(items, statuses, category, supplier, search, sort)
+    pages = max(1, -(-len(view) // size))
+    signature = (search, tuple(statuses), category, supplier, sort, size)
+    if st.session_state.get("inv_grid_filters") != signature:
+        st.session_state["inv_grid_filters"] = signature
+        st.session_state["inv_page"] = 1
+    page = min(max(st.session_state.get("inv_page", 1), 1), pages)
+    st.session_state["inv_page"] = page
+
+    visible = view.iloc[(page - 1) * size:page * size].to_dict("records")
+    if visible:
+        notes = item_mentions(ai.get("alerts", []), [row["name"] for row in visible])
+        cards = "".join(item_card(row, notes) for row in visible)
+        st.markdown(
+            f"<div style='display:grid; grid-template-columns:repeat(auto-fill, minmax(240px, 1fr)); gap:12px;'>{cards}</div>",
+            unsafe_allow_html=True,
+        )
+    else:
+        st.markdown("<p style='color:#9fb0c7;'>No items match these filters.</p>", unsafe_allow_html=True)
 
+    nav = st.columns([1, 2, 1, 1])
+    nav[0].button("‹ Prev", key="inv_prev", disabled=page <= 1, on_click=_turn_page, args=(-1,), use_container_width=True)
+    nav[1].markdown(
+        f"<div style='text-align:center; color:#9fb0c7; padding-top:8px;'>Page {page} of {pages} · {len(view):,} items</div>",
+        unsafe_allow_html=True,
+    )
+    nav[2].button("Next ›", key="inv_next", disabled=page >= pages, on_click=_turn_page, args=(1,), use_container_width=True)
+    nav[3].selectbox("Per page", GRID_PAGE_SIZES, key="inv_page_size", label_visibility="collapsed")
+
+
+@st.fragment
+def add_product_form():
+    """Add/update product form; submitting reruns only this fragment."""
+    st.markdown(
+        """
+        <div class="glass glass-strong animate-pop" style="padding: 28px 32px 24px 32px; max-width: 520px; margin: 0 auto; margin-top: 18px; border-radius: 18px; box-shadow: 0 12px 28px rgba(0,0,0,0.12);">
+        """,
+        unsafe_allow_html=True,
+    )
+    with st.form("add_product_form"):
+        st.markdown(
+            "<h4 style='margin-bottom: 2px;'>Add or Update Product</h4>"
+            "<div style='color:#9fb0c7; font-size:13px; margin-bottom:16px;'>Fill in the details to add a new inventory item.</div>",
+            unsafe_allow_html=True,
+        )
+        product_name = st.text_input("Product Name")
+        category = st.selectbox(
+            "Category",
+            [
+                "Coffee", "Desserts", "Pasta", "French Toast", "Fresh Juice & Soft Drink",
+                "Mojitos & Mocktails", "Appetizers", "Sliders And Burgers", "Main Course & Rice pots",
+                "Soup", "Salad", "Other"
+            ]
+        )
+        stock_qty = st.number_input("Stock Quantity", min_value=0, step=1)
+        min_stock = st.number_input("Minimum Required Stock", min_value=0, step=1)
+        unit_cost = st.number_input("Unit Cost", min_value=0.0, step=0.01, format="%.2f")
+        supplier = st.text_input("Supplier")
+        image_file = st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"])
+        submitted = st.form_submit_button("Submit", use_container_width=True)
+        msg = ""
+        if submitted:
+            if product_name.strip():
+                product_store().upsert(
+                    product_name,
+                    category=category,
+                    stock=stock_qty,
+                    min_stock=min_stock,
+                    unit_cost=unit_cost,
+                    supplier=supplier,
+                    image=image_file.getvalue() if image_file else None,
+                    image_name=image_file.name if image_file else "",
+                )
+                msg = "Product saved to inventory."
+            else:
+                st.warning("Enter a product name.")
+        if msg:
+            st.success(msg)
+    st.markdown("</div>", unsafe_allow_html=True)
 
 
 apply_theme()
@@ -81,9 +267,10 @@ tabs = st.tabs(["AI Loss Prevention", "Add Product"])
 
 # --- Tab 1: AI Loss Prevention (existing content) ---
 with tabs[0]:
-    inv = load_json("inventory.json")
     ai = load_json("ai.json")
-    items_df = pd.DataFrame(inv["items"])
+    items_df = live_stock(load_frame("inventory.json", "items"))
+    ai = {**ai, "alerts": live_alerts(ai.get("alerts", []), items_df["name"])}
+    status_df = classify(items_df)
     # ...existing code for AI Loss Prevention (all below remains unchanged)...
     # Header
     st.markdown(
@@ -104,99 +291,17 @@ with tabs[0]:
 
 # Inventory cards grid
     st.markdown("<div style='margin-top:6px;'></div>", unsafe_allow_html=True)
-    num_cols = 3
-    cols = st.columns(num_cols)
-    for idx, row in items_df.iterrows():
-        status, bg, fg = status_info(row)
-        pct = int((row["stock"] / row["min"]) * 100) if row["min"] else 100
-        pct = max(0, min(pct, 150))
-        bar_color = "#1B76FF" if status == "OK" else ("#E0B455" if status == "Low" else "#FF6B6B")
-        ai_note = None
-        if status != "OK":
-            ai_note = ai["alerts"][1] if "milk" in row["name"].lower() else "Demand trending up — reorder suggested."
-        with cols[idx % num_cols]:
-            st.markdown(
-                f"""
-                <div class="glass animate-pop" style="padding:12px; border-left:4px solid {bar_color}; min-height:150px; transition: transform 0.2s ease, box-shadow 0.2s ease;">
-                    <div style="display:flex; justify-content:space-between; align-items:center;">
-                        <strong>{row['name']}</strong>
-                        <span style="padding:4px 8px; border-radius:10px; background:{bg}; color:{fg}; font-weight:700;">{status}</span>
-                    </div>
-                    <div style="color:#9fb0c7; margin-top:6px;">Stock: {row['stock']} | Min: {row['min']}</div>
-                    <div style="margin-top:8px; height:8px; border-radius:8px; background:rgba(255,255,255,0.07); overflow:hidden;">
-                        <div style="width:{pct}%; height:100%; background:{bar_color};"></div>
-                    </div>
-                    <div style="color:#cbd7f0; margin-top:6px; font-size:12px;">Remaining: {pct}%</div>
-                    {"<div style='color:#ff8c8c; margin-top:6px; font-size:12px;'>"+ai_note+"</div>" if ai_note else ""}
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+    inventory_grid(status_df, ai)
 # --- Tab 2: Add Product ---
 with tabs[1]:
-    st.markdown(
-        """
-        <div class="glass glass-strong animate-pop" style="padding: 28px 32px 24px 32px; max-width: 520px; margin: 0 auto; margin-top: 18px; border-radius: 18px; box-shadow: 0 12px 28px rgba(0,0,0,0.12);">
-        """,
-        unsafe_allow_html=True,
-    )
-    with st.form("add_product_form"):
-        st.markdown(
-            "<h4 style='margin-bottom: 2px;'>Add or Update Product</h4>"
-            "<div style='color:#9fb0c7; font-size:13px; margin-bottom:16px;'>Fill in the details to add a new inventory item.</div>",
-            unsafe_allow_html=True,
-        )
-        product_name = st.text_input("Product Name")
-        category = st.selectbox(
-            "Category",
-            [
-                "Coffee", "Desserts", "Pasta", "French Toast", "Fresh Juice & Soft Drink",
-                "Mojitos & Mocktails", "Appetizers", "Sliders And Burgers", "Main Course & Rice pots",
-                "Soup", "Salad", "Other"
-            ]
-        )
-        stock_qty = st.number_input("Stock Quantity", min_value=0, step=1)
-        min_stock = st.number_input("Minimum Required Stock", min_value=0, step=1)
-        unit_cost = st.number_input("Unit Cost", min_value=0.0, step=0.01, format="%.2f")
-        supplier = st.text_input("Supplier")
-        image_file = st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"])
-        submitted = st.form_submit_button("Submit", use_container_width=True)
-        msg = ""
-        if submitted:
-            from pathlib import Path
-            import pandas as pd
-            data_dir = Path(__file__).resolve().parent.parent / "data"
-            data_dir.mkdir(exist_ok=True)
-            xlsx_path = data_dir / "inventory.xlsx"
-            img_bytes = image_file.getvalue() if image_file else None
-            img_name = image_file.name if image_file else ""
-            row = {
-                "Product Name": product_name,
-                "Category": category,
-                "Stock Quantity": stock_qty,
-                "Minimum Stock": min_stock,
-                "Unit Cost": unit_cost,
-                "Supplier": supplier,
-                "Image Name": img_name,
-                "Image Bytes": img_bytes,
-            }
-            if xlsx_path.exists():
-                df = pd.read_excel(xlsx_path)
-                if product_name in df["Product Name"].values:
-                    df.loc[df["Product Name"] == product_name, list(row.keys())] = list(row.values())
-                else:
-                    df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-            else:
-                df = pd.DataFrame([row])
-            df.to_excel(xlsx_path, index=False)
-            msg = "Product saved to inventory."
-        if msg:
-            st.success(msg)
-    st.markdown("</div>", unsafe_allow_html=True)
+    add_product_form()
 
 # AI Risk Zone
-critical = items_df[items_df.apply(lambda r: status_info(r)[0] == "Critical", axis=1)]
-low = items_df[items_df.apply(lambda r: status_info(r)[0] == "Low", axis=1)]
+depletion = depletion_forecast(items_df)
+runout = dict(zip(depletion["name"], depletion["hours"]))
+units = dict(zip(items_df["name"], items_df["unit"])) if "unit" in items_df else {}
+critical = status_df[status_df["status"] == "Critical"]
+low = status_df[status_df["status"] == "Low"]
 if not critical.empty or not low.empty:
     st.markdown(
         """
@@ -208,7 +313,11 @@ if not critical.empty or not low.empty:
     )
     risk_cols = st.columns(2)
     def risk_card(r, tone):
-        reason = "will run out within 4.3 hours based on demand rate" if tone == "critical" else "trending upward in usage due to morning rush"
+        reason = (
+            f"will run out within {hours_label(runout.get(r['name'], float('inf')))} based on demand rate"
+            if tone == "critical"
+            else "trending upward in usage due to morning rush"
+        )
         risk_color = "rgba(255,77,77,0.22)" if tone == "critical" else "rgba(224,180,85,0.22)"
         risk_border = "#FF6B6B" if tone == "critical" else "#E0B455"
         return f"""
@@ -219,69 +328,27 @@ if not critical.empty or not low.empty:
             </div>
         """
     for df, tone in [(critical, "critical"), (low, "low")]:
-        for idx, row in df.iterrows():
+        for idx, row in enumerate(df.to_dict("records")):
             with risk_cols[idx % 2]:
                 st.markdown(risk_card(row, tone), unsafe_allow_html=True)
 
 # Waste & loss analysis
-waste_df = pd.DataFrame(inv.get("waste_chart", []))
+waste_df = load_frame("inventory.json", "waste_chart", default=[])
 loss_breakdown = pd.DataFrame(
     [{"label": "Milk", "value": 67}, {"label": "Beans", "value": 22}, {"label": "Other", "value": 11}]
 )
 chart_cols = st.columns(2)
 with chart_cols[0]:
     if not waste_df.empty:
-        waste_fig = px.line(
-            waste_df,
-            x="day",
-            y="value",
-            title="Waste Trend (units)",
-            markers=True,
-            template="plotly_dark",
-        )
-        waste_fig.update_traces(line=dict(color="#1B76FF", width=3), marker=dict(size=8, color="#E0B455"))
-        waste_fig.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font=dict(color="#E8EEF9"),
-            margin=dict(l=20, r=20, t=40, b=20),
-        )
-        st.plotly_chart(waste_fig, use_container_width=True)
+        st.plotly_chart(cached_figure("inventory.waste", waste_figure, waste_df), use_container_width=True)
     st.markdown("<p style='color:#9fb0c7;'>AI Interpretation: Tuesday waste spike due to over-prep of Spanish Latte.</p>", unsafe_allow_html=True)
 
 with chart_cols[1]:
-    loss_fig = px.bar(
-        loss_breakdown,
-        x="label",
-        y="value",
-        title="Loss Breakdown",
-        color="value",
-        color_continuous_scale=["#5FB1FF", "#1B76FF"],
-        template="plotly_dark",
-    )
-    loss_fig.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font=dict(color="#E8EEF9"),
-        margin=dict(l=20, r=20, t=40, b=20),
-        coloraxis_showscale=False,
-    )
-    st.plotly_chart(loss_fig, use_container_width=True)
+    st.plotly_chart(cached_figure("inventory.loss", loss_figure, loss_breakdown), use_container_width=True)
     st.markdown("<p style='color:#9fb0c7;'>AI Interpretation: Milk is responsible for 67% of weekly waste.</p>", unsafe_allow_html=True)
 
 # Smart reorder engine
-raw_suggestions = inv.get("reorder_suggestions", [])
-structured = []
-for text in raw_suggestions:
-    amount = re.findall(r"Order\\s+(\\d+)", text)
-    item_name = re.sub(r"Order\\s+\\d+\\s+of\\s+", "", text, flags=re.IGNORECASE)
-    structured.append(
-        {
-            "item": item_name.strip(),
-            "amount": amount[0] if amount else "Check",
-            "reason": "Projected to run out by 6 PM due to evening peak.",
-        }
-    )
+structured = reorder_rows(reorder_plan(items_df, depletion), units)
 
 st.markdown(
     """
@@ -302,20 +369,20 @@ for s in structured:
         unsafe_allow_html=True,
     )
 
-pdf_bytes = build_supplier_pdf(structured)
 st.download_button(
     "Generate Supplier PDF",
-    data=pdf_bytes,
-    file_name="supplier_reorder_list.txt",
-    mime="text/plain",
+    data=lazy_pdf("supplier", supplier_pdf, structured, date.today()),
+    file_name="supplier_reorder_list.pdf",
+    mime="application/pdf",
+    on_click="ignore",
     use_container_width=True,
 )
 
 # Daily usage & prediction
+outlook = depletion.sort_values("hours", kind="stable").head(FORECAST_CARDS)
 forecast = [
-    {"item": "Coffee Beans", "amount": "3.1 kg", "trend": "up"},
-    {"item": "Milk 2L", "amount": "7 units", "trend": "up"},
-    {"item": "Cups", "amount": "420 units", "trend": "stable"},
+    {"item": r.name, "amount": f"{r.tomorrow:,.1f} {units.get(r.name, 'units')}", "trend": r.trend}
+    for r in outlook.itertuples()
 ]
 trend_icon = {"up": "⬆", "down": "⬇", "stable": "⟲"}
 st.markdown(
@@ -327,7 +394,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 fore_cols = st.columns(3)
-for col, entry in zip(fore_cols, forecast):
+for idx, entry in enumerate(forecast):
+    col = fore_cols[idx % 3]
     col.markdown(
         f"""
         <div class="glass animate-pop" style="padding:10px;">
@@ -340,11 +408,7 @@ for col, entry in zip(fore_cols, forecast):
     )
 
 # Inventory timeline
-timeline = [
-    {"item": "Coffee Beans", "hours": 4},
-    {"item": "Milk", "hours": 9},
-    {"item": "Cups", "hours": 72},
-]
+timeline = [{"item": r.name, "hours": r.hours} for r in outlook.itertuples()]
 st.markdown(
     """
     <div class="glass glass-strong animate-pop" style="padding:14px; margin-top:10px;">
@@ -354,12 +418,12 @@ st.markdown(
     unsafe_allow_html=True,
 )
 for t in timeline:
-    bar_width = min(t["hours"], 80)
+    bar_width = f"{min(t['hours'], 80):.0f}"
     color = "#FF6B6B" if t["hours"] < 6 else "#E0B455" if t["hours"] < 24 else "#1B76FF"
     st.markdown(
         f"""
         <div class="glass animate-pop" style="padding:10px; margin-bottom:8px;">
-            <strong>{t['item']}</strong> — {t['hours']}h
+            <strong>{t['item']}</strong> — {hours_label(t['hours'])}
             <div style="margin-top:6px; height:8px; border-radius:8px; background:rgba(255,255,255,0.07); overflow:hidden;">
                 <div style="width:{bar_width}%; height:100%; background:{color};"></div>
             </div>
@@ -369,10 +433,16 @@ for t in timeline:
     )
 
 # AI commentary bar
+first_out = timeline[0] if timeline and timeline[0]["hours"] != float("inf") else None
+commentary = (
+    f"{first_out['item']} will require restocking in about {hours_label(first_out['hours'])}."
+    if first_out
+    else "No item is projected to run out."
+)
 st.markdown(
-    """
+    f"""
     <div class="glass animate-pop" style="border-left:4px solid #1B76FF; box-shadow:0 0 16px rgba(27,118,255,0.25); margin-top:12px;">
-        <strong>IntaAgent™: Coffee Beans will require restocking by early afternoon. Consider adjusting prep and monitoring morning rush.</strong>
+        <strong>IntaAgent™: {commentary} Consider adjusting prep and monitoring morning rush.</strong>
     </div>
     """,
     unsafe_allow_html=True,
@@ -1,7 +1,6 @@
-import pandas as pd
 import streamlit as st
 
-from utils.loader import load_json
+from utils.loader import load_frame
 from utils.sidebar import render_sidebar
 from utils.theme import apply_theme
 
@@ -13,8 +12,7 @@ if not st.session_state.get("auth"):
     st.warning("Please login to access Products Cost.")
     st.switch_page("pages/1_Login.py")
 
-products = load_json("products.json")
-df = pd.DataFrame(products)
+df = load_frame("products.json")
 df["margin_pct"] = ((df["price"] - df["cost"]) / df["price"]) * 100
 
 
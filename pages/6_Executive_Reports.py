@@ -1,11 +1,13 @@
 from datetime import datetime
-from typing import List, Mapping
 
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
-from utils.loader import load_json
+from utils.figcache import cached_figure
+from utils.loader import load_frame, load_json
+from utils.pdfcache import lazy_pdf
+from utils.reports import report_pdf
 from utils.sidebar import render_sidebar
 from utils.theme import apply_theme
 
@@ -27,72 +29,49 @@ ai_insights = {
 }
 
 
-def pdf_escape(text: str) -> str:
-    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
-
+def profit_trend_figure(profit_vals):
+    fig_profit = px.line(y=profit_vals, title="Daily Profit Trend", height=180)
+    fig_profit.update_traces(line=dict(color="#1B76FF", width=3), marker=dict(size=6, color="#E0B455"))
+    fig_profit.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=10, r=10, t=40, b=10),
+        font=dict(color="#E8EEF9"),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+    )
+    return fig_profit
 
-def build_pdf(section: str, rows: List[Mapping]) -> bytes:
-    """Create a minimal PDF byte stream with black header and gold accent."""
-    header_height = 60
-    y = 760
-    content_lines = [
-        "q",
-        "0 0 0 rg",
-        f"0 {792 - header_height} 612 {header_height} re f",
-        "0.878 0.705 0.333 rg",
-        f"0 {792 - header_height} 612 3 re f",
-        "Q",
-        "BT",
-        "1 1 1 rg",
-        "/F1 20 Tf",
-        f"50 {y} Td",
-        f"({pdf_escape('Lark Executive Report')}) Tj",
-        "/F1 12 Tf",
-        "0 -22 Td",
-        f"({pdf_escape('Section: ' + section)}) Tj",
-    ]
-    y -= 48
-    content_lines.extend(["0 0 0 rg"])
-    for row in rows:
-        parts = []
-        for k, v in row.items():
-            if isinstance(v, (int, float)):
-                parts.append(f"{k}: AED {v:,.2f}")
-            else:
-                parts.append(f"{k}: {v}")
-        line_text = " • " + " — ".join(parts)
-        content_lines.extend(["0 -18 Td", f"({pdf_escape(line_text)}) Tj"])
-    content_lines.append("ET")
-    content = "\n".join(content_lines) + "\n"
-    content_bytes = content.encode("latin-1", errors="ignore")
 
-    objects = []
-    objects.append("1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
-    objects.append("2 0 obj\n<< /Type /Pages /Count 1 /Kids [3 0 R] >>\nendobj\n")
-    objects.append(
-        "3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
-        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>\nendobj\n"
+def category_figure(cat_df):
+    fig_cat = px.bar(cat_df, x="category", y="value", title="Category Contribution", height=200, color="value", color_continuous_scale=["#5FB1FF", "#1B76FF"])
+    fig_cat.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=10, r=10, t=40, b=10),
+        font=dict(color="#E8EEF9"),
+        coloraxis_showscale=False,
     )
-    objects.append("4 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>\nendobj\n")
-    objects.append(f"5 0 obj\n<< /Length {len(content_bytes)} >>\nstream\n{content}\nendstream\nendobj\n")
+    return fig_cat
 
-    pdf_header = "%PDF-1.4\n"
-    offsets = []
-    cursor = len(pdf_header)
-    body_parts = [pdf_header]
-    for obj in objects:
-        offsets.append(cursor)
-        body_parts.append(obj)
-        cursor += len(obj)
 
-    xref_start = cursor
-    xref = f"xref\n0 {len(objects)+1}\n0000000000 65535 f \n"
-    for off in offsets:
-        xref += f"{off:010d} 00000 n \n"
-    trailer = f"trailer\n<< /Size {len(objects)+1} /Root 1 0 R >>\nstartxref\n{xref_start}\n%%EOF"
-    body_parts.append(xref)
-    body_parts.append(trailer)
-    return "".join(body_parts).encode("latin-1", errors="ignore")
+def expenses_figure():
+    exp_rev = pd.DataFrame(
+        [
+            {"label": "Revenue", "value": 3450},
+            {"label": "Expenses", "value": 2100},
+        ]
+    )
+    fig_pie = px.pie(exp_rev, values="value", names="label", title="Expenses vs Revenue", hole=0.45, color_discrete_sequence=["#1B76FF", "#E0B455"], height=200)
+    fig_pie.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0, r=0, t=40, b=0),
+        font=dict(color="#E8EEF9"),
+        showlegend=True,
+        legend=dict(orientation="h", y=-0.15),
+    )
+    return fig_pie
 
 
 # Header block
@@ -174,7 +153,7 @@ main_col, side_col = st.columns([1.8, 1], gap="medium")
 
 with main_col:
     if selected:
-        df = pd.DataFrame(selected)
+        df = load_frame("reports.json", selected_key)
         # Add AI insight column
         def insight_for(metric):
             return ai_insights.get(metric, "AI reviewing…")
@@ -215,55 +194,22 @@ with side_col:
         profit_vals = [r.get("value", 0) if isinstance(r, dict) else 0 for r in selected][:7]
     else:
         profit_vals = [3450, 3320, 3580, 3600, 3740, 3890, 4010]
-    fig_profit = px.line(y=profit_vals, title="Daily Profit Trend", height=180)
-    fig_profit.update_traces(line=dict(color="#1B76FF", width=3), marker=dict(size=6, color="#E0B455"))
-    fig_profit.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        margin=dict(l=10, r=10, t=40, b=10),
-        font=dict(color="#E8EEF9"),
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-    )
     st.markdown("<div class='glass glass-strong animate-pop' style='padding:8px;'>", unsafe_allow_html=True)
-    st.plotly_chart(fig_profit, use_container_width=True, config={"displayModeBar": False})
+    st.plotly_chart(cached_figure("reports.profit_trend", profit_trend_figure, profit_vals), use_container_width=True, config={"displayModeBar": False})
     st.markdown("</div>", unsafe_allow_html=True)
 
     # Mini visual 2: Category contribution bar
-    cat_perf = reports.get("category_performance", [])
-    cat_df = pd.DataFrame(cat_perf) if cat_perf else pd.DataFrame(
-        [{"category": "Coffee", "value": 48}, {"category": "Cold Drinks", "value": 22}, {"category": "Food", "value": 18}, {"category": "Specialty", "value": 12}]
-    )
-    fig_cat = px.bar(cat_df, x="category", y="value", title="Category Contribution", height=200, color="value", color_continuous_scale=["#5FB1FF", "#1B76FF"])
-    fig_cat.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        margin=dict(l=10, r=10, t=40, b=10),
-        font=dict(color="#E8EEF9"),
-        coloraxis_showscale=False,
-    )
+    fallback_categories = [{"category": "Coffee", "value": 48}, {"category": "Cold Drinks", "value": 22}, {"category": "Food", "value": 18}, {"category": "Specialty", "value": 12}]
+    cat_df = load_frame("reports.json", "category_performance", default=fallback_categories)
+    if cat_df.empty:
+        cat_df = pd.DataFrame(fallback_categories)
     st.markdown("<div class='glass glass-strong animate-pop' style='padding:8px;'>", unsafe_allow_html=True)
-    st.plotly_chart(fig_cat, use_container_width=True, config={"displayModeBar": False})
+    st.plotly_chart(cached_figure("reports.category_contribution", category_figure, cat_df), use_container_width=True, config={"displayModeBar": False})
     st.markdown("</div>", unsafe_allow_html=True)
 
     # Mini visual 3: Expenses vs Revenue (mini pie)
-    exp_rev = pd.DataFrame(
-        [
-            {"label": "Revenue", "value": 3450},
-            {"label": "Expenses", "value": 2100},
-        ]
-    )
-    fig_pie = px.pie(exp_rev, values="value", names="label", title="Expenses vs Revenue", hole=0.45, color_discrete_sequence=["#1B76FF", "#E0B455"], height=200)
-    fig_pie.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        margin=dict(l=0, r=0, t=40, b=0),
-        font=dict(color="#E8EEF9"),
-        showlegend=True,
-        legend=dict(orientation="h", y=-0.15),
-    )
     st.markdown("<div class='glass glass-strong animate-pop' style='padding:8px;'>", unsafe_allow_html=True)
-    st.plotly_chart(fig_pie, use_container_width=True, config={"displayModeBar": False})
+    st.plotly_chart(cached_figure("reports.expenses_revenue", expenses_figure), use_container_width=True, config={"displayModeBar": False})
     st.markdown("</div>", unsafe_allow_html=True)
 
 # AI commentary strip
@@ -289,10 +235,15 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-pdf_bytes = build_pdf(selected_key, selected if isinstance(selected, list) else [])
 if st.download_button(
     "🖨 Generate PDF",
-    data=pdf_bytes,
+    data=lazy_pdf(
+        "report",
+        report_pdf,
+        selected_key,
+        selected if isinstance(selected, (list, tuple)) else [],
+        load_json("inventory.json").get("waste_chart", []) if selected_key == "waste_report" else [],
+    ),
     file_name="lark_executive_report.pdf",
     mime="application/pdf",
     use_container_width=True,
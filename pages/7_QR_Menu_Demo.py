@@ -1,12 +1,14 @@
 import streamlit as st
 
-from utils.loader import load_json
+from utils.journal import record_order
+from utils.loader import load_json, thaw
+from utils.rollups import top_sellers
 from utils.sidebar import render_sidebar
 from utils.theme import apply_theme
 
 
 def get_products():
-    data = load_json("products.json")
+    data = thaw(load_json("products.json"))
     # Add placeholder metadata
     for p in data:
         p.setdefault("description", "Signature Lark Café drink crafted with premium beans.")
@@ -89,7 +91,8 @@ st.markdown(chip_bar, unsafe_allow_html=True)
 
 # Recommended section
 st.markdown("### Recommended Today")
-rec_items = products[:3]
+seller_rank = {s["name"]: i for i, s in enumerate(top_sellers(3))}
+rec_items = sorted(products, key=lambda p: seller_rank.get(p["name"], len(seller_rank)))[:3]
 rec_cols = st.columns(3)
 for col, item in zip(rec_cols, rec_items):
     col.markdown(
@@ -169,6 +172,7 @@ if st.session_state["qr_modal"]:
                         "item": item["name"],
                         "qty": qty,
                         "price": item["price"],
+                        "category": item.get("category"),
                         "options": {"size": size, "sugar": sugar, "milk": milk},
                     }
                 )
@@ -199,6 +203,8 @@ st.markdown(f"**Total: AED {total:.2f}**")
 cart_cols = st.columns([1, 1])
 with cart_cols[0]:
     if st.button("Order Now", use_container_width=True):
+        if st.session_state["qr_cart"]:
+            record_order("qr", st.session_state["qr_cart"], total)
         st.success("Order placed (DEMO MODE)")
         st.session_state["qr_cart"] = []
 with cart_cols[1]:
@@ -2,7 +2,8 @@ import uuid
 
 import streamlit as st
 
-from utils.loader import load_json
+from utils.journal import record_order
+from utils.loader import load_json, thaw
 from utils.sidebar import render_sidebar
 from utils.theme import apply_theme
 
@@ -18,7 +19,7 @@ def categorize(name: str) -> str:
 @st.cache_data
 def get_products():
     try:
-        prods = load_json("products.json")
+        prods = thaw(load_json("products.json"))
     except Exception:
         prods = [
             {"name": "Latte", "price": 17, "description": "Classic milk coffee", "image": "https://images.unsplash.com/photo-1509042239860-f550ce710b93?auto=format&fit=crop&w=600&q=60"},
@@ -32,6 +33,110 @@ def get_products():
     return prods
 
 
+def cart_totals(cart):
+    """Subtotal, VAT, service charge and total for the cart lines."""
+    subtotal = sum(line["qty"] * line["price"] for line in cart)
+    vat = subtotal * 0.05
+    service = subtotal * 0.05
+    return subtotal, vat, service, subtotal + vat + service
+
+
+@st.fragment
+def order_panel():
+    """Item configurator, cart and totals; cart edits rerun only this panel."""
+    selected = st.session_state["pos_selected"]
+    if selected:
+        st.markdown(
+            f"""
+            <div class="glass glass-strong animate-pop" style="padding:12px;">
+                <div style="display:flex; gap:10px;">
+                    <img src="{selected['image']}" loading="lazy" style="width:80px; height:80px; border-radius:10px; object-fit:cover;"/>
+                    <div>
+                        <div style="font-weight:700;">{selected['name']}</div>
+                        <div style="color:#E0B455; font-weight:700;">AED {selected['price']:.2f}</div>
+                    </div>
+                </div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+        size = st.radio("Size", ["S", "M", "L"], horizontal=True, key="pos_size")
+        milk = st.radio("Milk", ["Whole", "Skim", "Oat"], horizontal=True, key="pos_milk")
+        ice = st.radio("Ice", ["Normal", "Less", "None"], horizontal=True, key="pos_ice")
+        sweet = st.radio("Sweetness", ["Normal", "Less", "None"], horizontal=True, key="pos_sweet")
+        extra = st.checkbox("Extra shot", key="pos_extra")
+        qty = st.number_input("Quantity", min_value=1, max_value=10, value=1, step=1, key="pos_qty")
+        if st.button("Add to Cart", use_container_width=True):
+            st.session_state["pos_cart"].append(
+                {
+                    "item": selected["name"],
+                    "qty": qty,
+                    "price": selected["price"],
+                    "category": selected.get("category"),
+                    "mods": {"size": size, "milk": milk, "ice": ice, "sweet": sweet, "extra": extra},
+                }
+            )
+
+    st.markdown("### Cart")
+    to_remove = []
+    for i, line in enumerate(st.session_state["pos_cart"]):
+        mods = line.get("mods", {})
+        mod_text = ", ".join([f"{k}: {('Yes' if v is True else v)}" for k, v in mods.items()])
+        c1, c2, c3 = st.columns([2, 1, 1])
+        with c1:
+            st.markdown(f"**{line['item']}**")
+            st.markdown(f"<span style='color:#9fb0c7; font-size:12px;'>{mod_text}</span>", unsafe_allow_html=True)
+        with c2:
+            if st.button("+", key=f"inc_{i}"):
+                st.session_state["pos_cart"][i]["qty"] += 1
+            if st.button("-", key=f"dec_{i}"):
+                st.session_state["pos_cart"][i]["qty"] = max(1, st.session_state["pos_cart"][i]["qty"] - 1)
+        with c3:
+            st.markdown(f"<div style='color:#E0B455; font-weight:700;'>AED {line['qty']*line['price']:.2f}</div>", unsafe_allow_html=True)
+        if st.button("Remove", key=f"rm_{i}"):
+            to_remove.append(i)
+    for idx in reversed(to_remove):
+        st.session_state["pos_cart"].pop(idx)
+
+    subtotal, vat, service, total = cart_totals(st.session_state["pos_cart"])
+    st.markdown(
+        f"""
+        <div class="glass glass-strong animate-pop" style="padding:10px; margin-top:8px;">
+            <div style="display:flex; justify-content:space-between;"><span>Subtotal</span><span>AED {subtotal:.2f}</span></div>
+            <div style="display:flex; justify-content:space-between;"><span>VAT 5%</span><span>AED {vat:.2f}</span></div>
+            <div style="display:flex; justify-content:space-between;"><span>Service</span><span>AED {service:.2f}</span></div>
+            <div style="display:flex; justify-content:space-between; font-weight:700; color:#E0B455; margin-top:6px;"><span>Total</span><span>AED {total:.2f}</span></div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+@st.fragment
+def payment_panel():
+    """Payment method and checkout."""
+    st.markdown("### Payment")
+    option = st.radio("Choose method", ["Cash", "Card", "QR Payment (demo)", "Mark as Paid (demo)"], key="pos_pay_method")
+    if st.session_state.pop("pos_paid_notice", False):
+        st.success("Payment accepted — order completed.")
+    if st.button("Confirm Payment", use_container_width=True):
+        total = cart_totals(st.session_state["pos_cart"])[3]
+        receipt = {
+            "id": str(uuid.uuid4())[:8].upper(),
+            "items": list(st.session_state["pos_cart"]),
+            "total": total,
+            "method": option,
+        }
+        if receipt["items"]:
+            record_order("pos", receipt["items"], total, method=option, order_id=receipt["id"])
+        st.session_state["pos_payment"] = True
+        st.session_state["pos_receipt"] = receipt
+        st.session_state["pos_cart"] = []
+        st.session_state["pos_paid_notice"] = True
+        # The cart lives in another fragment: redraw the whole page once.
+        st.rerun()
+
+
 apply_theme()
 # Determine mode from query (?mode=menu for customer view, default pos for management)
 qp = st.query_params
@@ -141,84 +246,5 @@ with left:
                     if st.button(f"Select {item['name']}", key=f"select_{cat}_{idx}", use_container_width=True):
                         st.session_state["pos_selected"] = item
 with right:
-    selected = st.session_state["pos_selected"]
-    if selected:
-        st.markdown(
-            f"""
-            <div class="glass glass-strong animate-pop" style="padding:12px;">
-                <div style="display:flex; gap:10px;">
-                    <img src="{selected['image']}" loading="lazy" style="width:80px; height:80px; border-radius:10px; object-fit:cover;"/>
-                    <div>
-                        <div style="font-weight:700;">{selected['name']}</div>
-                        <div style="color:#E0B455; font-weight:700;">AED {selected['price']:.2f}</div>
-                    </div>
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        size = st.radio("Size", ["S", "M", "L"], horizontal=True, key="pos_size")
-        milk = st.radio("Milk", ["Whole", "Skim", "Oat"], horizontal=True, key="pos_milk")
-        ice = st.radio("Ice", ["Normal", "Less", "None"], horizontal=True, key="pos_ice")
-        sweet = st.radio("Sweetness", ["Normal", "Less", "None"], horizontal=True, key="pos_sweet")
-        extra = st.checkbox("Extra shot", key="pos_extra")
-        qty = st.number_input("Quantity", min_value=1, max_value=10, value=1, step=1, key="pos_qty")
-        if st.button("Add to Cart", use_container_width=True):
-            st.session_state["pos_cart"].append(
-                {
-                    "item": selected["name"],
-                    "qty": qty,
-                    "price": selected["price"],
-                    "mods": {"size": size, "milk": milk, "ice": ice, "sweet": sweet, "extra": extra},
-                }
-            )
-
-    st.markdown("### Cart")
-    to_remove = []
-    for i, line in enumerate(st.session_state["pos_cart"]):
-        mods = line.get("mods", {})
-        mod_text = ", ".join([f"{k}: {('Yes' if v is True else v)}" for k, v in mods.items()])
-        c1, c2, c3 = st.columns([2, 1, 1])
-        with c1:
-            st.markdown(f"**{line['item']}**")
-            st.markdown(f"<span style='color:#9fb0c7; font-size:12px;'>{mod_text}</span>", unsafe_allow_html=True)
-        with c2:
-            if st.button("+", key=f"inc_{i}"):
-                st.session_state["pos_cart"][i]["qty"] += 1
-            if st.button("-", key=f"dec_{i}"):
-                st.session_state["pos_cart"][i]["qty"] = max(1, st.session_state["pos_cart"][i]["qty"] - 1)
-        with c3:
-            st.markdown(f"<div style='color:#E0B455; font-weight:700;'>AED {line['qty']*line['price']:.2f}</div>", unsafe_allow_html=True)
-        if st.button("Remove", key=f"rm_{i}"):
-            to_remove.append(i)
-    for idx in reversed(to_remove):
-        st.session_state["pos_cart"].pop(idx)
-
-    subtotal = sum(line["qty"] * line["price"] for line in st.session_state["pos_cart"])
-    vat = subtotal * 0.05
-    service = subtotal * 0.05
-    total = subtotal + vat + service
-    st.markdown(
-        f"""
-        <div class="glass glass-strong animate-pop" style="padding:10px; margin-top:8px;">
-            <div style="display:flex; justify-content:space-between;"><span>Subtotal</span><span>AED {subtotal:.2f}</span></div>
-            <div style="display:flex; justify-content:space-between;"><span>VAT 5%</span><span>AED {vat:.2f}</span></div>
-            <div style="display:flex; justify-content:space-between;"><span>Service</span><span>AED {service:.2f}</span></div>
-            <div style="display:flex; justify-content:space-between; font-weight:700; color:#E0B455; margin-top:6px;"><span>Total</span><span>AED {total:.2f}</span></div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-    st.markdown("### Payment")
-    option = st.radio("Choose method", ["Cash", "Card", "QR Payment (demo)", "Mark as Paid (demo)"], key="pos_pay_method")
-    if st.button("Confirm Payment", use_container_width=True):
-        st.session_state["pos_payment"] = True
-        st.session_state["pos_receipt"] = {
-            "id": str(uuid.uuid4())[:8].upper(),
-            "items": list(st.session_state["pos_cart"]),
-            "total": total,
-            "method": option,
-        }
-        st.session_state["pos_cart"] = []
-        st.success("Payment accepted — order completed.")
+    order_panel()
+    payment_panel()
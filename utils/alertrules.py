@@ -0,0 +1,96 @@
+"""Alert severity rules compiled into one regex.
+
+``RULES`` lists English and Arabic keywords per severity. They are compiled into a
+single alternation with one named group per severity, so classifying an alert is one
+scan of its text however many keywords there are. When several severities match, the
+most severe wins ("critical" > "warning" > "info"). English terms match whole words
+with an optional inflection ("increase" also matches "increased", "up" does not match
+"update"). Arabic terms match anywhere, since prefixes such as "ال" or "و" attach to
+the word. Results are memoized per alert text.
+
+``item_mentions`` uses the same approach to link inventory items to the alerts that
+name them.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+SEVERITIES = ("critical", "warning", "info")
+
+RULES = {
+    "critical": {
+        "en": ["low", "down", "below", "risk", "risky", "under", "shortage", "out of stock", "drop", "dropped"],
+        "ar": ["منخفض", "انخفاض", "أقل", "خطر", "نقص", "نفاد", "تحت"],
+    },
+    "warning": {
+        "en": ["increase", "increasing", "spike", "spiking", "up", "surge", "surging", "rise", "rising"],
+        "ar": ["زيادة", "ارتفاع", "قفزة", "ازدياد"],
+    },
+    "info": {
+        "en": ["good", "strong", "healthy"],
+        "ar": ["جيد", "قوي", "ممتاز"],
+    },
+}
+
+EN_SUFFIX = "(?:s|es|d|ed|ing)?"
+CACHE_SIZE = 65536
+_SIZE_SUFFIX = re.compile(r"\s*\b\d+(?:\.\d+)?\s*(?:l|ml|kg|g|oz|pcs?)\b", re.IGNORECASE)
+
+
+def compile_rules(rules: Dict[str, Dict[str, Sequence[str]]] = RULES) -> "re.Pattern":
+    """One case-insensitive alternation with a named group per severity."""
+    groups = []
+    for severity in SEVERITIES:
+        spec = rules.get(severity, {})
+        terms = [rf"\b{re.escape(t)}{EN_SUFFIX}\b" for t in sorted(spec.get("en", ()), key=len, reverse=True)]
+        terms += [re.escape(t) for t in sorted(spec.get("ar", ()), key=len, reverse=True)]
+        if terms:
+            groups.append(f"(?P<{severity}>{'|'.join(terms)})")
+    return re.compile("|".join(groups), re.IGNORECASE)
+
+
+_PATTERN = compile_rules()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def severity(text: str) -> Optional[str]:
+    """Most severe rule matched by ``text`` (None when nothing matches)."""
+    found = {m.lastgroup for m in _PATTERN.finditer(text)}
+    for level in SEVERITIES:
+        if level in found:
+            return level
+    return None
+
+
+def classify(alerts: Iterable[str]) -> List[Optional[str]]:
+    """Severity for each alert, in order."""
+    return [severity(a) for a in alerts]
+
+
+def item_keyword(name: str) -> str:
+    """Name as it appears in prose: pack sizes dropped ("Milk 2L" -> "milk")."""
+    return _SIZE_SUFFIX.sub("", name).strip().lower()
+
+
+@lru_cache(maxsize=256)
+def _mentions(alerts: Tuple[str, ...], names: Tuple[str, ...]) -> Dict[str, str]:
+    keywords = {}
+    for name in names:
+        keyword = item_keyword(name)
+        if keyword:
+            keywords.setdefault(keyword, name)
+    if not keywords:
+        return {}
+    terms = sorted(keywords, key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")", re.IGNORECASE)
+    found: Dict[str, str] = {}
+    for alert in alerts:
+        for m in pattern.finditer(alert):
+            found.setdefault(keywords[m.group(0).lower()], alert)
+    return found
+
+
+def item_mentions(alerts: Iterable[str], names: Iterable[str]) -> Dict[str, str]:
+    """Item name -> first alert that mentions it, scanning every alert once."""
+    return _mentions(tuple(alerts), tuple(names))
@@ -0,0 +1,270 @@
+"""Streaming anomaly alerts for sales, item and ingredient activity.
+
+Every tracked series is one column of a few NumPy arrays: shop sales and order count,
+quantity per menu item, ingredient usage per inventory item (through the bill of
+materials) and, for records that carry them, ``discount`` amounts and ``void`` flags.
+An event only adds its value to the column's total for the hour in progress, so it
+costs O(1) whatever the number of series. When an hour closes, the whole row of hourly
+totals is compared with an exponentially weighted mean and variance for that hour of
+day (a z-score per series) and then folded into it, one vectorized step for tens of
+thousands of series. Series are registered on first sight; no per-series Python
+objects are kept.
+
+Closed hours that land more than ``Z_THRESHOLD`` deviations (and ``MIN_CHANGE``)
+from the usual level for that hour become ``Alert`` records, once the series has been
+active in that hour on ``WARMUP`` days (so sporadic sellers never alert); the hour in
+progress is also checked for spikes. ``live_alerts`` turns them into the text alerts
+the pages show, worded so ``utils.alertrules`` grades spikes as warnings and drops as
+critical.
+"""
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from utils.bom import order_lines
+from utils.journal import JOURNAL_PATH, journal_size, replay
+from utils.timebucket import HOURS, SECONDS_PER_HOUR, hour_label, local_offset, to_epoch
+
+
+ALPHA = 0.3  # weight of the newest day in each hour-of-day slot
+Z_THRESHOLD = 3.0
+MIN_CHANGE = 0.25  # and at least 25% away from the usual level
+MIN_REL_STD = 0.1  # deviation floor as a share of the mean, for series that never vary
+WARMUP = 4  # days with activity an hour-of-day slot needs before it can alert
+ALERT_HOURS = 3  # closed hours kept on the alert list
+MAX_GAP_HOURS = 7 * HOURS  # longer idle gaps only fold their last week of empty hours
+MAX_ALERTS = 6
+KEPT_ALERTS = 256
+
+LABELS = {
+    "sales": "Sales",
+    "orders": "Orders",
+    "discounts": "Discounts",
+    "voids": "Voided orders",
+}
+
+
+class Alert(NamedTuple):
+    kind: str  # "sales", "orders", "item", "usage", "discounts" or "voids"
+    name: str  # menu item or ingredient ("" for shop-wide series)
+    hour: int  # local epoch hour the value belongs to
+    value: float
+    expected: float
+    z: float
+    closed: bool  # False while the hour is still in progress
+
+    @property
+    def direction(self) -> str:
+        return "up" if self.value > self.expected else "down"
+
+    @property
+    def text(self) -> str:
+        if self.kind == "item":
+            subject = f"{self.name} sales"
+        elif self.kind == "usage":
+            subject = f"{self.name} usage"
+        else:
+            subject = LABELS.get(self.kind, self.kind.title())
+        change = abs(self.value / self.expected - 1) * 100
+        when = f"for {hour_label(self.hour % HOURS)}" if self.closed else "so far this hour"
+        return f"{subject} {self.direction} {change:.0f}% vs usual {when}"
+
+
+class AnomalyDetector:
+    """EWMA mean/variance per (hour of day, series) with hourly z-score checks."""
+
+    def __init__(self, alpha: float = ALPHA, utc_offset: Optional[int] = None, capacity: int = 64):
+        self.alpha = alpha
+        self.utc_offset = local_offset() if utc_offset is None else utc_offset
+        self.index: dict = {}  # (kind, name) -> column
+        self.keys: list = []
+        self.mean = np.zeros((HOURS, capacity))
+        self.var = np.zeros((HOURS, capacity))
+        self.active = np.zeros((HOURS, capacity), dtype=np.int32)  # closed hours with activity
+        self.open = np.zeros(capacity)  # totals of the hour in progress
+        self.hour: Optional[int] = None  # local epoch hour in progress
+        self.flagged: deque = deque(maxlen=KEPT_ALERTS)
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def columns(self, keys: Iterable[tuple]) -> np.ndarray:
+        """Column of each ``(kind, name)`` key, registering unseen ones."""
+        cols = []
+        for key in keys:
+            col = self.index.get(key)
+            if col is None:
+                col = self.index[key] = len(self.keys)
+                self.keys.append(key)
+            cols.append(col)
+        if self.size > self.open.size:
+            capacity = max(self.size, 2 * self.open.size)
+            for name in ("mean", "var", "active"):
+                old = getattr(self, name)
+                grown = np.zeros((HOURS, capacity), dtype=old.dtype)
+                grown[:, :old.shape[1]] = old
+                setattr(self, name, grown)
+            grown = np.zeros(capacity)
+            grown[:self.open.size] = self.open
+            self.open = grown
+        return np.asarray(cols, dtype=np.int64)
+
+    def local_hours(self, ts) -> np.ndarray:
+        return (to_epoch(ts) + self.utc_offset) // SECONDS_PER_HOUR
+
+    def _score(self, slot: int, values: np.ndarray) -> tuple:
+        n = values.size
+        mean = self.mean[slot, :n]
+        std = np.maximum(np.sqrt(self.var[slot, :n]), MIN_REL_STD * mean)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, (values - mean) / std, 0.0)
+        ready = (self.active[slot, :n] >= WARMUP) & (mean > 0)
+        flag = ready & (np.abs(z) >= Z_THRESHOLD) & (np.abs(values - mean) >= MIN_CHANGE * mean)
+        return np.flatnonzero(flag), mean, z
+
+    def _flag(self, hour: int, cols, values, mean, z, closed: bool) -> List[Alert]:
+        return [
+            Alert(*self.keys[c], hour, float(values[c]), float(mean[c]), float(z[c]), closed)
+            for c in cols
+        ]
+
+    def _close_until(self, hour: int) -> None:
+        """Close every hour before local epoch ``hour``: score it, then fold it in."""
+        if self.hour is None or hour <= self.hour:
+            return
+        n, a = self.size, self.alpha
+        values = self.open[:n].copy()
+        self.open[:n] = 0
+        # Hours after a long idle gap are all zero and the EWMA has long forgotten
+        # anything before them, so only the last week of the gap is folded.
+        start = max(self.hour + 1, hour - MAX_GAP_HOURS)
+        for h in [self.hour, *range(start, hour)]:
+            slot = h % HOURS
+            cols, mean, z = self._score(slot, values)
+            if cols.size:
+                self.flagged.extend(self._flag(h, cols, values, mean, z, True))
+            diff = values - mean
+            self.mean[slot, :n] = mean + a * diff
+            self.var[slot, :n] = (1 - a) * (self.var[slot, :n] + a * diff * diff)
+            self.active[slot, :n] += values != 0
+            if h == self.hour:
+                values = np.zeros(n)
+        self.hour = hour
+
+    def add(self, ts, cols, values) -> None:
+        """Add events (epoch seconds, column, value); late events count in the open hour."""
+        ts = to_epoch(ts)
+        if ts.size == 0:
+            return
+        order = np.argsort(ts, kind="stable")
+        hours = self.local_hours(ts[order])
+        cols = np.asarray(cols, dtype=np.int64)[order]
+        values = np.asarray(values, dtype=float)[order]
+        if self.hour is None:
+            self.hour = int(hours[0])
+        cuts = np.flatnonzero(np.diff(hours)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, hours.size]):
+            self._close_until(int(hours[lo]))
+            self.open[:self.size] += np.bincount(cols[lo:hi], weights=values[lo:hi], minlength=self.size)
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Close all hours that have ended by ``now``."""
+        self._close_until(int(self.local_hours(int(now if now is not None else time.time()))))
+
+    def ready(self) -> bool:
+        """Whether any hour-of-day slot has enough history to alert."""
+        return bool((self.active[:, :self.size] >= WARMUP).any())
+
+    def alerts(self, now: Optional[float] = None, hours: int = ALERT_HOURS) -> List[Alert]:
+        """Alerts from the last ``hours`` closed hours plus spikes in the hour in progress.
+
+        One alert per series (the latest), strongest deviation first.
+        """
+        self.advance(now)
+        if self.hour is None:
+            return []
+        found = [a for a in self.flagged if a.hour >= self.hour - hours]
+        values = self.open[:self.size]
+        cols, mean, z = self._score(self.hour % HOURS, values)
+        spikes = cols[z[cols] > 0]
+        found += self._flag(self.hour, spikes, values, mean, z, False)
+        latest = {}
+        for alert in found:
+            latest[(alert.kind, alert.name)] = alert
+        return sorted(latest.values(), key=lambda a: -abs(a.z))
+
+
+def journal_events(detector: AnomalyDetector, records: Iterable[dict]) -> tuple:
+    """(timestamps, columns, values) for the shop-wide and per-item series of ``records``."""
+    ts, keys, values = [], [], []
+    for record in records:
+        lines = record.get("lines", [])
+        events = [
+            (("sales", ""), sum(line["qty"] * line["price"] for line in lines)),
+            (("orders", ""), 1.0),
+        ]
+        if record.get("discount"):
+            events.append((("discounts", ""), float(record["discount"])))
+        if record.get("void"):
+            events.append((("voids", ""), 1.0))
+        events += [(("item", line["item"]), float(line["qty"])) for line in lines]
+        for key, value in events:
+            ts.append(record["ts"])
+            keys.append(key)
+            values.append(value)
+    return np.asarray(ts, dtype=float), detector.columns(keys), np.asarray(values, dtype=float)
+
+
+_DETECTOR: Optional[AnomalyDetector] = None
+_SOURCES: tuple = ()  # (order lines generation, ingredient names)
+_CONSUMED = (0, 0)  # (journal offset, order lines) folded into _DETECTOR
+_LOCK = threading.Lock()
+
+
+def anomaly_alerts(ingredients: Sequence[str], now: Optional[float] = None) -> Optional[List[Alert]]:
+    """Current alerts from every journaled order (None until there is enough history).
+
+    The detector is shared per process and caught up from the journal watermark and the
+    bill-of-materials order lines on each call.
+    """
+    global _DETECTOR, _SOURCES, _CONSUMED
+    names = tuple(ingredients)
+    lines = order_lines(names)
+    with _LOCK:
+        offset, seen_lines = _CONSUMED
+        if (
+            _DETECTOR is None
+            or _SOURCES != (lines.generation, names)
+            or offset > journal_size(JOURNAL_PATH)
+            or seen_lines > lines.size
+        ):
+            _DETECTOR, _SOURCES, offset, seen_lines = AnomalyDetector(), (lines.generation, names), 0, 0
+        detector = _DETECTOR
+        records = []
+        for offset, record in replay(JOURNAL_PATH, offset):
+            records.append(record)
+        parts = [journal_events(detector, records)]
+        if lines.size > seen_lines:
+            new = slice(seen_lines, lines.size)
+            ts, ingredient, amount = lines.bom.line_usage(lines.ts[new], lines.variant[new], lines.qty[new])
+            cols = detector.columns([("usage", name) for name in names])
+            parts.append((ts, cols[ingredient], amount))
+        _CONSUMED = (offset, lines.size)
+        detector.add(*(np.concatenate(p) for p in zip(*parts)))
+        if not detector.ready():
+            return None
+        return detector.alerts(now)
+
+
+def live_alerts(static: Sequence[str], ingredients: Sequence[str], limit: int = MAX_ALERTS) -> List[str]:
+    """Alert texts from live order history, or ``static`` while history is too short."""
+    found = anomaly_alerts(ingredients)
+    if found is None:
+        return list(static)
+    if not found:
+        return [f"No unusual sales or usage in the last {ALERT_HOURS} hours"]
+    return [a.text for a in found[:limit]]
@@ -0,0 +1,191 @@
+"""Rolling-origin backtests for the demand and depletion forecasters.
+
+    python -m utils.backtest --series 500 --days 42 --folds 4 --horizon 24 --workers 4
+    python -m utils.backtest --journal data/orders.journal
+
+Hourly history comes from synthetic demand (daily cafe profile, busier weekends,
+per-series scale and drift, Poisson noise) or from a journal's per-item quantities.
+For each fold the forecasters are fitted on every hour before the fold's origin and
+predict the next ``horizon`` hours; origins step back one horizon at a time from the
+end of the data. Folds x methods run in a pool of spawned processes.
+
+Methods: ``seasonal-naive`` (same hour yesterday, the baseline), ``holt-winters``
+(``utils.forecast``) and ``depletion`` (the EWMA hour-of-day rates of
+``utils.depletion``). Accuracy is MAPE over hours with sales and MASE against the
+in-sample seasonal-naive error; latency is the fit and predict time of a fold divided
+by its series count.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.depletion import HOUR_PROFILE, DepletionModel
+from utils.forecast import DemandHistory, fit_series, project
+from utils.timebucket import DAYS, HOURS, SECONDS_PER_HOUR
+
+
+METHODS = ("seasonal-naive", "holt-winters", "depletion")
+WEEKEND_LIFT = 1.25
+
+
+def synthetic_history(series: int, days: int, seed: int = 0) -> Tuple[np.ndarray, int, List[str]]:
+    """(hours x series) Poisson demand, its first local epoch hour and series names."""
+    rng = np.random.default_rng(seed)
+    start = (int(time.time()) // SECONDS_PER_HOUR // HOURS - days) * HOURS
+    hours = start + np.arange(days * HOURS)
+    weekday = (hours // HOURS + 3) % DAYS
+    shape = HOUR_PROFILE[hours % HOURS] * HOURS * np.where(weekday >= 5, WEEKEND_LIFT, 1.0)
+    scale = rng.lognormal(0.0, 0.8, series)
+    drift = 1 + rng.normal(0.0, 0.15, series) * (np.arange(hours.size) / hours.size)[:, None]
+    y = rng.poisson(shape[:, None] * scale * drift).astype(float)
+    return y, start, [f"item-{i}" for i in range(series)]
+
+
+def journal_history(path: Path) -> Tuple[np.ndarray, int, List[str]]:
+    """Hourly quantity per menu item from an order journal."""
+    history = DemandHistory()
+    history.refresh(path)
+    if history.start is None:
+        raise ValueError(f"no orders in {path}")
+    items = [k for k in history.keys if k[0] == "item"]
+    y, start = history.window(int(history.local_hours(time.time())))
+    return y[:, history.columns(items)], start, [name for _, name in items]
+
+
+def predict(method: str, train: np.ndarray, start: int, horizon: int) -> Tuple[np.ndarray, float, float]:
+    """Forecast (horizon x series) after ``train``, with fit and predict seconds."""
+    origin = start + train.shape[0]
+    t0 = time.perf_counter()
+    if method == "seasonal-naive":
+        t1 = time.perf_counter()
+        forecast = train[-HOURS:][np.arange(horizon) % HOURS]
+    elif method == "holt-winters":
+        _, level, trend, seasonal = fit_series(train, start, HOURS, workers=1)
+        t1 = time.perf_counter()
+        forecast = project(level, trend, seasonal, origin, horizon)
+    elif method == "depletion":
+        model = DepletionModel(range(train.shape[1]), train[:HOURS].sum(axis=0), utc_offset=0)
+        rows, cols = np.nonzero(train)
+        model.add_usage((start + rows) * SECONDS_PER_HOUR, cols, train[rows, cols])
+        model.advance(origin * SECONDS_PER_HOUR)
+        t1 = time.perf_counter()
+        forecast = model.mean[:, (origin + np.arange(horizon)) % HOURS].T
+    else:
+        raise ValueError(f"unknown method: {method}")
+    return forecast, t1 - t0, time.perf_counter() - t1
+
+
+def scores(train: np.ndarray, actual: np.ndarray, forecast: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-series MAPE (%, hours with sales only) and MASE (vs in-sample seasonal naive)."""
+    error = np.abs(forecast - actual)
+    sold = actual > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mape = 100 * np.where(sold, error / np.where(sold, actual, 1), 0).sum(axis=0) / sold.sum(axis=0)
+        scale = np.abs(train[HOURS:] - train[:-HOURS]).mean(axis=0)
+        mase = np.where(scale > 0, error.mean(axis=0) / scale, np.nan)
+    return mape, mase
+
+
+def run_fold(method: str, y: np.ndarray, start: int, origin: int, horizon: int) -> dict:
+    """Worker: fit on ``y[:origin]`` and score the next ``horizon`` hours."""
+    train, actual = y[:origin], y[origin:origin + horizon]
+    forecast, fit_s, predict_s = predict(method, train, start, horizon)
+    mape, mase = scores(train, actual, forecast)
+    return {"method": method, "origin": origin, "mape": mape, "mase": mase, "fit": fit_s, "predict": predict_s}
+
+
+def backtest(
+    y: np.ndarray,
+    start: int,
+    names: Sequence[str],
+    methods: Sequence[str] = METHODS,
+    folds: int = 4,
+    horizon: int = HOURS,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """One row per (method, fold, series): ``mape``, ``mase``, ``fit_us`` and ``predict_us``."""
+    origins = [y.shape[0] - k * horizon for k in range(folds, 0, -1)]
+    if origins[0] < 2 * HOURS:
+        raise ValueError(f"need at least {2 * HOURS + folds * horizon} hours of history, have {y.shape[0]}")
+    tasks = [(m, y[:o + horizon], start, o, horizon) for m in methods for o in origins]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        results = [run_fold(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_fold, *zip(*tasks)))
+    n = len(names)
+    return pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "method": r["method"],
+                    "fold": origins.index(r["origin"]),
+                    "series": names,
+                    "mape": r["mape"],
+                    "mase": r["mase"],
+                    "fit_us": r["fit"] / n * 1e6,
+                    "predict_us": r["predict"] / n * 1e6,
+                }
+            )
+            for r in results
+        ],
+        ignore_index=True,
+    )
+
+
+def summary(frame: pd.DataFrame) -> pd.DataFrame:
+    """Mean/median accuracy and mean per-series latency by method."""
+    return frame.groupby("method", sort=False).agg(
+        mape=("mape", "mean"),
+        median_mape=("mape", "median"),
+        mase=("mase", "mean"),
+        fit_us=("fit_us", "mean"),
+        predict_us=("predict_us", "mean"),
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.backtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--journal", type=Path, default=None, help="backtest this order journal instead of synthetic data")
+    parser.add_argument("--series", type=int, default=200, help="synthetic series (default: 200)")
+    parser.add_argument("--days", type=int, default=42, help="synthetic history in days (default: 42)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--horizon", type=int, default=HOURS, help=f"hours per fold (default: {HOURS})")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", type=Path, default=None, help="write per-series results to this CSV")
+    args = parser.parse_args(argv)
+    try:
+        if args.journal is not None:
+            y, start, names = journal_history(args.journal)
+        else:
+            y, start, names = synthetic_history(args.series, args.days, args.seed)
+        began = time.perf_counter()
+        frame = backtest(y, start, names, args.methods, args.folds, args.horizon, args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - began
+    print(f"{len(names)} series x {y.shape[0]} hours, {args.folds} fold(s) of {args.horizon}h, {elapsed:.2f}s")
+    print(f"{'method':<16}{'MAPE %':>9}{'median':>9}{'MASE':>8}{'fit us':>10}{'predict us':>12}")
+    for method, row in summary(frame).iterrows():
+        print(
+            f"{method:<16}{row['mape']:>9.1f}{row['median_mape']:>9.1f}{row['mase']:>8.3f}"
+            f"{row['fit_us']:>10.1f}{row['predict_us']:>12.1f}"
+        )
+    if args.out is not None:
+        frame.to_csv(args.out, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Render the PDF exports for many branches at once.
+
+    python -m utils.batch_reports BRANCH_DIR [BRANCH_DIR ...] --out reports_out --workers 4
+
+Each branch directory holds its own ``sales.json``, ``ai.json``, ``inventory.json`` and
+``reports.json`` (the demo_data layout) and optionally a ``settings.json`` with its name
+and logo; without one the Settings page branding is used. Branches are rendered in a
+process pool with the same builders the pages call: the executive snapshot, one report
+per ``reports.json`` section and the supplier reorder list. The journal-backed live
+figures are specific to this install, so the snapshot and the reorder plan use each
+branch's seed data (``daily_usage`` priors for demand). Each branch writes to its own
+folder under ``--out``, named after the branch folder; folders that share a name are
+told apart by their parents (``dubai/data`` -> ``dubai_data``).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from utils.depletion import DepletionModel
+from utils.loader import load_json, records_frame
+from utils.reorder import reorder_plan, reorder_rows
+from utils.reports import branding, report_pdf, snapshot_pdf, supplier_pdf
+from utils.stockstatus import low_stock as low_stock_items
+
+
+DEFAULT_OUT = Path("reports_out")
+
+
+def supplier_rows(items) -> list:
+    """Reorder lines for a branch from its seed usage (no journal history)."""
+    frame = records_frame(items)
+    usage = frame["daily_usage"] if "daily_usage" in frame else [0.0] * len(frame)
+    result = DepletionModel(frame["name"], usage).forecast(frame["stock"])
+    forecast = frame[["name"]].assign(
+        hours=result["hours"], tomorrow=result["daily_mean"], tomorrow_std=result["daily_var"] ** 0.5
+    )
+    units = dict(zip(frame["name"], frame["unit"])) if "unit" in frame else {}
+    return reorder_rows(reorder_plan(frame, forecast), units)
+
+
+def branch_documents(data_dir: Path, brand: dict, day: date) -> dict:
+    """File name -> PDF bytes for one branch directory."""
+    sales = load_json("sales.json", data_dir)
+    ai = load_json("ai.json", data_dir)
+    inv = load_json("inventory.json", data_dir)
+    reports = load_json("reports.json", data_dir)
+
+    low_stock = low_stock_items(records_frame(inv["items"]))
+    peak = ai.get("prediction", {}).get("next_busy_hour")
+    docs = {"snapshot.pdf": snapshot_pdf(sales, ai.get("alerts", []), low_stock, peak, brand=brand)}
+    for section, rows in reports.items():
+        if not isinstance(rows, (list, tuple)):
+            continue
+        trend = inv.get("waste_chart", []) if section == "waste_report" else []
+        docs[f"report_{section}.pdf"] = report_pdf(section, rows, trend, brand=brand)
+    docs["supplier_reorder_list.pdf"] = supplier_pdf(supplier_rows(inv["items"]), day, brand=brand)
+    return docs
+
+
+def output_names(dirs: List[Path]) -> List[str]:
+    """Output folder per branch: its name, or its shortest distinguishing path tail ("dubai_data")."""
+    parts = [Path(os.path.abspath(d)).parts[1:] or ("root",) for d in dirs]
+    names = []
+    for own in parts:
+        depth = 1
+        while depth < len(own) and sum(p[-depth:] == own[-depth:] for p in parts) > 1:
+            depth += 1
+        names.append("_".join(own[-depth:]))
+    return names
+
+
+def render_branch(data_dir: str, out_dir: str, day: date, name: Optional[str] = None) -> dict:
+    """Worker: render and write one branch into ``out_dir/name``; returns timing and output stats."""
+    start = time.perf_counter()
+    src = Path(data_dir)
+    settings = src / "settings.json"
+    brand = branding(settings) if settings.exists() else branding()
+    docs = branch_documents(src, brand, day)
+    target = Path(out_dir) / (name or src.name)
+    target.mkdir(parents=True, exist_ok=True)
+    for name, data in docs.items():
+        (target / name).write_bytes(data)
+    return {
+        "branch": target.name,
+        "files": len(docs),
+        "bytes": sum(len(d) for d in docs.values()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run(dirs: List[Path], out_dir: Path, workers: Optional[int] = None, day: Optional[date] = None) -> List[dict]:
+    """Render every branch in ``dirs`` in parallel, printing a line per branch and a summary."""
+    day = day or date.today()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(dirs)))
+    results, failed = [], 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(render_branch, str(d), str(out_dir), day, name): name
+            for d, name in zip(dirs, output_names(dirs))
+        }
+        for future in as_completed(futures):
+            try:
+                stats = future.result()
+            except Exception as exc:
+                failed += 1
+                print(f"{futures[future]:<24} FAILED  {exc}", file=sys.stderr)
+                continue
+            results.append(stats)
+            print(f"{stats['branch']:<24} {stats['files']:>3} PDFs {stats['bytes'] / 1024:>8.1f} KB {stats['seconds'] * 1000:>8.1f} ms")
+    elapsed = time.perf_counter() - start
+    files = sum(r["files"] for r in results)
+    print(
+        f"{len(results)} branch(es), {files} PDFs in {elapsed:.2f}s with {workers} worker(s): "
+        f"{files / elapsed:.1f} PDFs/s, {len(results) / elapsed:.1f} branches/s"
+        + (f", {failed} failed" if failed else "")
+    )
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.batch_reports", description=__doc__.splitlines()[0])
+    parser.add_argument("dirs", nargs="+", type=Path, help="branch data directories")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"output folder (default: {DEFAULT_OUT})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    missing = [d for d in args.dirs if not d.is_dir()]
+    if missing:
+        parser.error("not a directory: " + ", ".join(map(str, missing)))
+    if len({d.resolve() for d in args.dirs}) < len(args.dirs):
+        parser.error("the same branch directory is listed more than once")
+    results = run(args.dirs, args.out, args.workers)
+    return 0 if len(results) == len(args.dirs) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
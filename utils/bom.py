@@ -0,0 +1,224 @@
+"""Bill of materials: ingredient draw-down from journaled order lines.
+
+``demo_data/bom.json`` maps each menu item to ingredient quantities per serving and
+each modifier option (POS ``mods`` / QR ``options``: size, milk, extra shot) to a
+change of that recipe: ``scale`` multiplies every ingredient not listed as ``fixed``
+(cups stay one per drink), ``scale_ingredients`` multiplies named ingredients (oat
+milk uses no dairy) and ``add`` adds quantities (an extra shot of beans).
+
+Every distinct (item, modifiers) combination is compiled once into a sparse row of
+ingredient amounts (CSR arrays). Draw-down for any batch of order lines is then the
+sparse product of per-variant line counts and that matrix, done with two
+``np.bincount`` calls over the COO triplets, with no per-line arithmetic in Python.
+
+``OrderLines`` keeps journaled lines as (timestamp, variant, qty) arrays caught up
+from the journal watermark, with a running total of ingredients used; ``live_stock``
+subtracts it from the seed stock in ``inventory.json``.
+"""
+import threading
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.journal import JOURNAL_PATH, journal_size, replay
+from utils.loader import load_json
+
+
+BOM_FILE = "bom.json"
+
+
+class BillOfMaterials:
+    """Menu item + modifier variants compiled to sparse ingredient rows."""
+
+    def __init__(self, spec: Mapping, ingredients: Sequence[str]):
+        self.ingredients = tuple(ingredients)
+        self._index = {name: i for i, name in enumerate(self.ingredients)}
+        self.recipes = spec.get("items", {})
+        self.modifiers = spec.get("modifiers", {})
+        self.fixed = set(spec.get("fixed", ()))
+        self._variants: dict = {}
+        self._indptr = [0]
+        self._col: list = []
+        self._val: list = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._indptr) - 1
+
+    def covered(self) -> np.ndarray:
+        """Mask of ingredients that any recipe or modifier draws down."""
+        names = {i for r in self.recipes.values() for i in r}
+        for options in self.modifiers.values():
+            for opt in options.values():
+                names.update(opt.get("add", {}))
+        return np.array([n in names for n in self.ingredients], dtype=bool)
+
+    def _modifier_key(self, mods: Optional[Mapping]) -> tuple:
+        key = []
+        for name, value in (mods or {}).items():
+            options = self.modifiers.get(name)
+            if not options:
+                continue
+            value = str(value).lower() if isinstance(value, bool) else str(value)
+            if value in options:
+                key.append((name, value))
+        return tuple(sorted(key))
+
+    def variant(self, item: str, mods: Optional[Mapping] = None) -> int:
+        """Row of ``item`` with ``mods`` (compiled on first use); -1 when it has no recipe."""
+        key = (item, self._modifier_key(mods))
+        row = self._variants.get(key)
+        if row is not None:
+            return row
+        recipe = self.recipes.get(item)
+        if recipe is None:
+            row = -1
+        else:
+            amounts = dict(recipe)
+            options = [self.modifiers[name][value] for name, value in key[1]]
+            for opt in options:
+                scale = opt.get("scale", 1.0)
+                for name in amounts:
+                    if name not in self.fixed:
+                        amounts[name] *= scale
+                for name, factor in opt.get("scale_ingredients", {}).items():
+                    if name in amounts:
+                        amounts[name] *= factor
+            for opt in options:
+                for name, qty in opt.get("add", {}).items():
+                    amounts[name] = amounts.get(name, 0.0) + qty
+            for name, qty in amounts.items():
+                if name in self._index and qty:
+                    self._col.append(self._index[name])
+                    self._val.append(float(qty))
+            self._indptr.append(len(self._col))
+            self._arrays = None
+            row = self.size - 1
+        self._variants[key] = row
+        return row
+
+    def matrix(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR ``(indptr, col, val)`` of the compiled variants."""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._indptr, dtype=np.int64),
+                np.asarray(self._col, dtype=np.int64),
+                np.asarray(self._val, dtype=float),
+            )
+        return self._arrays
+
+    def drawdown(self, variant, qty) -> np.ndarray:
+        """Ingredient totals for order lines: (per-variant counts) x BOM as a sparse product."""
+        variant = np.asarray(variant, dtype=np.int64)
+        qty = np.asarray(qty, dtype=float)
+        known = variant >= 0
+        counts = np.bincount(variant[known], weights=qty[known], minlength=self.size)
+        indptr, col, val = self.matrix()
+        rows = np.repeat(np.arange(self.size), np.diff(indptr))
+        return np.bincount(col, weights=counts[rows] * val, minlength=len(self.ingredients))
+
+    def line_usage(self, ts, variant, qty) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Expand order lines into (timestamp, ingredient, amount) triplets."""
+        ts = np.asarray(ts)
+        variant = np.asarray(variant, dtype=np.int64)
+        qty = np.asarray(qty, dtype=float)
+        known = variant >= 0
+        ts, variant, qty = ts[known], variant[known], qty[known]
+        indptr, col, val = self.matrix()
+        lengths = np.diff(indptr)[variant]
+        line = np.repeat(np.arange(variant.size), lengths)
+        first = np.repeat(indptr[variant] - (np.cumsum(lengths) - lengths), lengths)
+        pos = first + np.arange(line.size)
+        return ts[line], col[pos], qty[line] * val[pos]
+
+
+class OrderLines:
+    """Journaled order lines as growable arrays, with cumulative ingredient usage."""
+
+    def __init__(self, bom: BillOfMaterials, capacity: int = 1024, generation: int = 0):
+        self.bom = bom
+        self.generation = generation  # bumped by order_lines on every rebuild
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._variant = np.empty(capacity, dtype=np.int64)
+        self._qty = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+        self.watermark = 0
+        self.used = np.zeros(len(bom.ingredients))
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self._ts[:self.size]
+
+    @property
+    def variant(self) -> np.ndarray:
+        return self._variant[:self.size]
+
+    @property
+    def qty(self) -> np.ndarray:
+        return self._qty[:self.size]
+
+    def _extend(self, ts, variant, qty) -> None:
+        needed = self.size + len(ts)
+        if needed > self._ts.size:
+            capacity = max(needed, 2 * self._ts.size)
+            for name in ("_ts", "_variant", "_qty"):
+                old = getattr(self, name)
+                grown = np.empty(capacity, dtype=old.dtype)
+                grown[:self.size] = old[:self.size]
+                setattr(self, name, grown)
+        self._ts[self.size:needed] = ts
+        self._variant[self.size:needed] = variant
+        self._qty[self.size:needed] = qty
+        self.size = needed
+
+    def refresh(self, path: Path = JOURNAL_PATH) -> int:
+        """Append lines journaled since the watermark and draw them down; returns how many."""
+        if self.watermark > journal_size(path):
+            self.__init__(self.bom, generation=self.generation)
+        ts, variant, qty = [], [], []
+        for offset, record in replay(path, self.watermark):
+            for line in record.get("lines", []):
+                ts.append(record["ts"])
+                variant.append(self.bom.variant(line["item"], line.get("mods")))
+                qty.append(line["qty"])
+            self.watermark = offset
+        if ts:
+            self._extend(ts, variant, qty)
+            self.used += self.bom.drawdown(variant, qty)
+        return len(ts)
+
+
+_LINES: Optional[OrderLines] = None
+_SOURCES: tuple = ()
+_GENERATION = 0
+_LOCK = threading.Lock()
+
+
+def order_lines(ingredients: Sequence[str]) -> OrderLines:
+    """Process-wide order lines for ``ingredients``, refreshed on each call.
+
+    Rebuilt (and the journal replayed) when ``bom.json`` or the ingredient list changes;
+    each rebuild gets a new ``generation`` so consumers can tell it from the previous one.
+    """
+    global _LINES, _SOURCES, _GENERATION
+    spec = load_json(BOM_FILE)
+    names = tuple(ingredients)
+    with _LOCK:
+        if _LINES is None or _SOURCES[0] is not spec or _SOURCES[1] != names:
+            _GENERATION += 1
+            _LINES = OrderLines(BillOfMaterials(spec, names), generation=_GENERATION)
+            _SOURCES = (spec, names)
+        _LINES.refresh()
+        return _LINES
+
+
+def live_stock(items: pd.DataFrame) -> pd.DataFrame:
+    """``items`` with ``stock`` reduced by every journaled sale (never below zero)."""
+    lines = order_lines(items["name"].astype(str))
+    if not lines.used.any():
+        return items
+    stock = np.maximum(items["stock"].to_numpy(dtype=float) - lines.used, 0)
+    return items.assign(stock=np.round(stock, 2))
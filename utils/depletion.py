@@ -0,0 +1,236 @@
+"""Per-SKU depletion forecasting from usage history.
+
+Each inventory item has a consumption rate for every hour of the day, held as a
+(sku x 24) array seeded from ``daily_usage`` in ``inventory.json`` spread over
+``HOUR_PROFILE``. Observed usage is folded in one closed hour at a time as an
+exponentially weighted mean and variance per (sku, hour-of-day) slot, a day of
+hours per NumPy step, so thousands of SKUs cost a handful of array operations.
+``forecast`` turns the rates and current stock into hours-to-depletion and next-day
+demand for every SKU at once.
+
+Journaled order lines are drawn down through the bill of materials (``utils.bom``).
+SKUs no recipe uses are drawn down per order by their seed ``daily_usage`` divided by
+the expected orders per day (``sales.json["orders_today"]``), so their usage still
+follows real order volume and timing.
+"""
+import hashlib
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.bom import order_lines
+from utils.loader import load_json
+from utils.timebucket import HOURS, SECONDS_PER_HOUR, local_offset, order_times, to_epoch
+
+
+ALPHA = 0.3  # weight of the newest day in each hour-of-day slot
+TREND_BAND = 0.1  # last 24h vs expected day beyond +/-10% reads as up/down
+
+# Share of a day's usage per local hour for a cafe open roughly 7 AM - 11 PM.
+HOUR_PROFILE = np.array(
+    [0, 0, 0, 0, 0, 0, 1, 4, 8, 9, 8, 6, 7, 7, 5, 5, 6, 7, 8, 7, 5, 3, 2, 1],
+    dtype=float,
+)
+HOUR_PROFILE /= HOUR_PROFILE.sum()
+
+
+class DepletionModel:
+    """EWMA usage rates per (SKU, hour of day), updated from timestamped usage."""
+
+    def __init__(self, names: Sequence[str], daily_usage, alpha: float = ALPHA, utc_offset: Optional[int] = None):
+        self.names = tuple(names)
+        self.alpha = alpha
+        self.utc_offset = local_offset() if utc_offset is None else utc_offset
+        prior = np.asarray(daily_usage, dtype=float).reshape(-1, 1) * HOUR_PROFILE
+        self.mean = prior.copy()
+        self.var = np.zeros_like(prior)
+        self.recent = prior.T.copy()  # usage of the last 24 closed hours, by hour of day
+        self.folded: Optional[int] = None  # first local epoch hour not yet folded
+        self.pending = np.zeros((0, len(self.names)))
+        self.version = 0
+
+    def local_hours(self, ts) -> np.ndarray:
+        """Local epoch hour of each timestamp."""
+        return (to_epoch(ts) + self.utc_offset) // SECONDS_PER_HOUR
+
+    def _fold_until(self, hour: int) -> None:
+        """Fold every hour before local epoch ``hour``; hours with no usage count as zero."""
+        closed = hour - self.folded
+        if closed <= 0:
+            return
+        usage = np.zeros((closed, len(self.names)))
+        n = min(closed, self.pending.shape[0])
+        usage[:n] = self.pending[:n]
+        a = self.alpha
+        for start in range(0, closed, HOURS):
+            block = usage[start:start + HOURS]
+            cols = (self.folded + start + np.arange(block.shape[0])) % HOURS
+            mean = self.mean[:, cols]
+            diff = block.T - mean
+            self.mean[:, cols] = mean + a * diff
+            self.var[:, cols] = (1 - a) * (self.var[:, cols] + a * diff * diff)
+            self.recent[cols] = block
+        self.pending = self.pending[n:]
+        self.folded = hour
+        self.version += 1
+
+    def advance(self, now: Optional[float] = None) -> None:
+        """Fold all hours that have closed by ``now``."""
+        if self.folded is not None:
+            self._fold_until(int(self.local_hours(int(now if now is not None else time.time()))))
+
+    def add_usage(self, ts, sku, qty) -> None:
+        """Record usage triplets: epoch seconds, SKU index and quantity (equal-length arrays)."""
+        ts = to_epoch(ts)
+        if ts.size == 0:
+            return
+        order = np.argsort(ts, kind="stable")
+        hour = self.local_hours(ts[order])
+        sku = np.asarray(sku, dtype=np.int64)[order]
+        qty = np.asarray(qty, dtype=float)[order]
+        if self.folded is None:
+            self.folded = int(hour[0])
+        n_sku = len(self.names)
+        cuts = np.flatnonzero(np.diff(hour // HOURS)) + 1
+        for lo, hi in zip(np.r_[0, cuts], np.r_[cuts, hour.size]):
+            h = hour[lo:hi]
+            self._fold_until(int(h[0]))
+            rows = np.maximum(h, self.folded) - self.folded  # late usage lands in the oldest open hour
+            size = int(rows[-1]) + 1
+            if size > self.pending.shape[0]:
+                grown = np.zeros((size, n_sku))
+                grown[:self.pending.shape[0]] = self.pending
+                self.pending = grown
+            flat = np.bincount(rows * n_sku + sku[lo:hi], weights=qty[lo:hi], minlength=size * n_sku)
+            self.pending[:size] += flat.reshape(size, n_sku)
+        self.version += 1
+
+    def forecast(self, stock, now: Optional[float] = None) -> dict:
+        """Hours to depletion, next-day demand (mean, variance) and trend ratio per SKU.
+
+        Depletion walks the hour-of-day rates forward from the current hour (net of usage
+        already logged this hour), whole days first and then within the last day, so the
+        horizon is unbounded. SKUs with no usage never deplete (``inf``).
+        """
+        now = int(now if now is not None else time.time())
+        self.advance(now)
+        stock = np.maximum(np.asarray(stock, dtype=float), 0)
+        hour = int(self.local_hours(now))
+        rates = self.mean[:, (hour + np.arange(HOURS)) % HOURS]
+        # Usage already logged this hour is part of this hour's rate: walk from the start of
+        # the hour with that usage credited back, then skip the time it accounts for.
+        credit = np.zeros_like(stock)
+        if self.folded == hour and self.pending.shape[0]:
+            credit = np.minimum(self.pending[0], rates[:, 0])
+        stock = stock + credit
+        cum = np.cumsum(rates, axis=1)
+        per_day = cum[:, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days = np.where(per_day > 0, np.maximum(np.ceil(stock / per_day) - 1, 0), 0)
+            rest = stock - days * per_day
+            k = np.minimum((cum < rest[:, None]).sum(axis=1), HOURS - 1)
+            rows = np.arange(stock.size)
+            before = np.where(k > 0, cum[rows, k - 1], 0.0)
+            rate = rates[rows, k]
+            frac = np.where(rate > 0, (rest - before) / rate, 0.0)
+            skip = np.where(credit > 0, credit / rates[:, 0], 0.0)
+            hours = np.where(per_day > 0, np.maximum(days * HOURS + k + frac - skip, 0), np.inf)
+            expected = self.mean.sum(axis=1)
+            trend = np.where(expected > 0, self.recent.sum(axis=0) / expected, 1.0)
+        return {
+            "hours": hours,
+            "daily_mean": expected,
+            "daily_var": self.var.sum(axis=1),
+            "trend": trend,
+        }
+
+
+def trend_labels(ratio: np.ndarray) -> np.ndarray:
+    """"up" / "down" / "stable" for last-24h-over-expected usage ratios."""
+    return np.select([ratio > 1 + TREND_BAND, ratio < 1 - TREND_BAND], ["up", "down"], "stable")
+
+
+def hours_label(hours: float) -> str:
+    """"5.1h", "3.0 days" or "no usage" for a hours-to-depletion value."""
+    if not np.isfinite(hours):
+        return "no usage"
+    return f"{hours:.1f}h" if hours < 48 else f"{hours / 24:.1f} days"
+
+
+_MODEL: Optional[DepletionModel] = None
+_MODEL_KEY: Optional[str] = None
+_CONSUMED = (0, 0)  # (order lines, order timestamps) folded into _MODEL
+_RESULT: Optional[tuple] = None  # (key, frame)
+_LOCK = threading.Lock()
+
+
+def _catch_up(model: DepletionModel, lines, store, per_order: np.ndarray) -> None:
+    """Fold order lines and order timestamps not yet seen into ``model``.
+
+    SKUs covered by the bill of materials get their exact draw-down per line; the rest
+    are drawn down by ``per_order`` for every order.
+    """
+    global _CONSUMED
+    seen_lines, seen_orders = _CONSUMED
+    parts = []
+    if lines.size > seen_lines:
+        new = slice(seen_lines, lines.size)
+        parts.append(lines.bom.line_usage(lines.ts[new], lines.variant[new], lines.qty[new]))
+    fallback = np.flatnonzero(per_order * ~lines.bom.covered())
+    if store.size > seen_orders and fallback.size:
+        hours, counts = np.unique(model.local_hours(store.values[seen_orders:store.size]), return_counts=True)
+        parts.append(
+            (
+                np.repeat(hours * SECONDS_PER_HOUR - model.utc_offset, fallback.size),
+                np.tile(fallback, hours.size),
+                np.outer(counts, per_order[fallback]).ravel(),
+            )
+        )
+    _CONSUMED = (lines.size, store.size)
+    if parts:
+        model.add_usage(*(np.concatenate(p) for p in zip(*parts)))
+
+
+def depletion_forecast(items: pd.DataFrame, now: Optional[float] = None) -> pd.DataFrame:
+    """Forecast for every row of ``items`` (``name``, ``stock``, ``daily_usage``).
+
+    Returns ``name``, ``stock``, ``hours`` (to depletion), ``tomorrow`` and ``tomorrow_std``
+    (next-day demand) and ``trend`` ("up"/"down"/"stable"). The model is shared per process
+    and rebuilt only when the catalog or seed usage changes; the result is cached until new
+    orders arrive, an hour closes or stock changes. Treat the returned frame as read-only.
+    """
+    global _MODEL, _MODEL_KEY, _CONSUMED, _RESULT
+    names = tuple(items["name"].astype(str))
+    usage = (items["daily_usage"] if "daily_usage" in items else pd.Series(0.0, index=items.index))
+    usage = usage.fillna(0).to_numpy(dtype=float)
+    stock = items["stock"].to_numpy(dtype=float)
+    now = int(now if now is not None else time.time())
+    store = order_times()
+    lines = order_lines(names)
+    model_key = hashlib.sha1(repr((names, lines.generation)).encode("utf-8") + usage.tobytes()).hexdigest()
+    with _LOCK:
+        if _MODEL is None or model_key != _MODEL_KEY or lines.size < _CONSUMED[0] or store.size < _CONSUMED[1]:
+            _MODEL, _MODEL_KEY, _CONSUMED, _RESULT = DepletionModel(names, usage), model_key, (0, 0), None
+        model = _MODEL
+        orders_per_day = float(load_json("sales.json").get("orders_today") or 0)
+        _catch_up(model, lines, store, usage / orders_per_day if orders_per_day > 0 else np.zeros_like(usage))
+        model.advance(now)
+        key = (model_key, model.version, int(model.local_hours(now)), stock.tobytes())
+        if _RESULT is not None and _RESULT[0] == key:
+            return _RESULT[1]
+        result = model.forecast(stock, now)
+        frame = pd.DataFrame(
+            {
+                "name": names,
+                "stock": stock,
+                "hours": result["hours"],
+                "tomorrow": result["daily_mean"],
+                "tomorrow_std": np.sqrt(result["daily_var"]),
+                "trend": trend_labels(result["trend"]),
+            }
+        )
+        _RESULT = (key, frame)
+    return frame
@@ -0,0 +1,96 @@
+"""Process-wide cache of serialized Plotly figures.
+
+Figures are keyed on a fingerprint of the data they are built from plus the accent
+colour in ``st.session_state["accent_color"]`` and stored as figure JSON in a
+bounded LRU evicted by byte size. On a hit the chart costs a dictionary lookup
+and a ``json.loads`` instead of a Plotly Express build.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+MAX_BYTES = 32 * 1024 * 1024
+
+
+def _default(obj: Any):
+    if isinstance(obj, pd.DataFrame):
+        return [list(map(str, obj.columns)), pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes().hex()]
+    if isinstance(obj, pd.Series):
+        return pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes().hex()
+    if isinstance(obj, np.ndarray):
+        return [obj.dtype.str, obj.shape, hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest()]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of JSON-like data, DataFrames and arrays."""
+    raw = json.dumps(parts, sort_keys=True, default=_default, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """LRU of figure JSON strings bounded by total byte size."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: str) -> None:
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._items[key] = payload
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+
+_CACHE = FigureCache()
+
+
+def cached_figure(name: str, builder: Callable[..., Any], *args: Any, accent: Optional[str] = None) -> dict:
+    """Return the figure dict ``builder(*args)`` for chart ``name``, building it only on a cache miss.
+
+    The key is a fingerprint of ``name``, ``args`` and the accent colour, so ``args`` must
+    carry everything the builder reads.
+    """
+    accent = accent or st.session_state.get("accent_color", "Blue")
+    key = fingerprint(name, accent, args)
+    payload = _CACHE.get(key)
+    if payload is None:
+        payload = builder(*args).to_json()
+        _CACHE.put(key, payload)
+    return json.loads(payload)
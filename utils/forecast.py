@@ -0,0 +1,305 @@
+"""Demand forecasts per menu item and per store hour from journaled orders.
+
+``DemandHistory`` keeps hourly order counts and quantity per menu item as an
+(hour x series) array, caught up from the journal watermark and trimmed to
+``HISTORY_DAYS``. Each series also remembers the journal offset that last touched it.
+
+Series are forecast with additive Holt-Winters (damped trend), whose seasonal slots
+are clock hours: a weekly season (168 hours) for store-wide orders once two weeks are
+journaled, a daily one otherwise and for items. Smoothing parameters come from a small
+grid searched for every series at once (the grid is a leading array axis); seasonal
+naive is the ``alpha=0, gamma=1`` point of that grid and the only candidate while
+there is less than two seasons of history. Fitted parameters and state are cached:
+series touched since their fit are refit, the rest only roll their cached state
+forward over the hours that closed since. Large refits are split across a pool of
+spawned processes (the pages call in from Streamlit's threads, where forking is unsafe).
+
+``demand_forecast`` feeds the Qx Intelligence prediction tiles and heatmap.
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.journal import JOURNAL_PATH, journal_size, replay
+from utils.timebucket import DAYS, HOURS, SECONDS_PER_HOUR, local_offset, to_epoch
+
+
+HISTORY_DAYS = 56
+WEEK = DAYS * HOURS
+PHI = 0.98  # trend damping per hour
+HORIZON = WEEK
+GRID = np.array(
+    [(0.0, 0.0, 1.0)]  # seasonal naive
+    + list(itertools.product((0.05, 0.2, 0.5), (0.0, 0.02), (0.05, 0.2, 0.5))),
+)
+FIT_CHUNK = 2048  # series per fitting task; more than one chunk goes to a process pool
+ORDERS = ("orders", "")
+
+
+def _smooth(y, start: int, m: int, alpha, beta, gamma, level, trend, seasonal):
+    """Run the Holt-Winters recursions over ``y`` (hours x series) from local hour ``start``.
+
+    Parameters broadcast against the state, so a leading axis can hold a parameter grid.
+    ``seasonal`` (..., m, series) is updated in place; returns level, trend and the SSE
+    of the one-step-ahead errors.
+    """
+    sse = np.zeros(np.broadcast(level, alpha).shape)
+    for t in range(y.shape[0]):
+        slot = (start + t) % m
+        s = seasonal[..., slot, :]
+        x = y[t]
+        damped = level + PHI * trend
+        e = x - damped - s
+        sse += e * e
+        new_level = alpha * (x - s) + (1 - alpha) * damped
+        trend = beta * (new_level - level) + (1 - beta) * PHI * trend
+        seasonal[..., slot, :] = gamma * (x - new_level) + (1 - gamma) * s
+        level = new_level
+    return level, trend, sse
+
+
+def fit_block(y: np.ndarray, start: int, m: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Best grid parameters and end state for every column of ``y`` (at least ``m`` hours).
+
+    The first season initialises level, trend and seasonal offsets; the grid is scored
+    on the rest. Returns ``(params, level, trend, seasonal)``.
+    """
+    n = y.shape[1]
+    first = y[:m]
+    level = first.mean(axis=0)
+    trend = (y[m:2 * m].mean(axis=0) - level) / m if y.shape[0] >= 2 * m else np.zeros(n)
+    seasonal = np.empty((m, n))
+    seasonal[(start + np.arange(m)) % m] = first - level
+    grid = GRID if y.shape[0] >= 2 * m else GRID[:1]
+    a, b, g = (grid[:, i, None] for i in range(3))
+    p = len(grid)
+    seasons = np.broadcast_to(seasonal, (p, m, n)).copy()
+    levels, trends, sse = _smooth(
+        y[m:], start + m, m, a, b, g, np.broadcast_to(level, (p, n)), np.broadcast_to(trend, (p, n)), seasons
+    )
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(n)
+    return grid[best], levels[best, cols], trends[best, cols], seasons[best, :, cols].T
+
+
+def fit_series(y: np.ndarray, start: int, m: int, workers: Optional[int] = None):
+    """``fit_block`` over all columns, in ``FIT_CHUNK`` column blocks (parallel when several)."""
+    blocks = [y[:, i:i + FIT_CHUNK] for i in range(0, y.shape[1], FIT_CHUNK)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(blocks)))
+    if workers == 1:
+        parts = [fit_block(block, start, m) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = list(pool.map(fit_block, blocks, itertools.repeat(start), itertools.repeat(m)))
+    params, level, trend, seasonal = zip(*parts)
+    return np.concatenate(params), np.concatenate(level), np.concatenate(trend), np.concatenate(seasonal, axis=1)
+
+
+def project(level, trend, seasonal, start: int, horizon: int) -> np.ndarray:
+    """Forecast (horizon x series) for the ``horizon`` hours from local hour ``start``, never below zero."""
+    m = seasonal.shape[0]
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(PHI ** steps)[:, None]
+    out = level + damping * trend + seasonal[(start + steps - 1) % m]
+    return np.maximum(out, 0)
+
+
+class DemandHistory:
+    """Hourly orders and per-item quantities fed from the journal tail."""
+
+    def __init__(self, utc_offset: Optional[int] = None, capacity: int = 64):
+        self.utc_offset = local_offset() if utc_offset is None else utc_offset
+        self.index: dict = {}  # (kind, name) -> column
+        self.keys: list = []
+        self.counts = np.zeros((0, capacity))
+        self.start: Optional[int] = None  # local epoch hour of row 0
+        self.touched = np.zeros(capacity, dtype=np.int64)  # journal offset of each series' latest data
+        self.watermark = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def local_hours(self, ts) -> np.ndarray:
+        return (to_epoch(ts) + self.utc_offset) // SECONDS_PER_HOUR
+
+    def columns(self, keys: Iterable[tuple]) -> np.ndarray:
+        cols = []
+        for key in keys:
+            col = self.index.get(key)
+            if col is None:
+                col = self.index[key] = len(self.keys)
+                self.keys.append(key)
+            cols.append(col)
+        if self.size > self.counts.shape[1]:
+            capacity = max(self.size, 2 * self.counts.shape[1])
+            grown = np.zeros((self.counts.shape[0], capacity))
+            grown[:, :self.counts.shape[1]] = self.counts
+            self.counts = grown
+            touched = np.zeros(capacity, dtype=np.int64)
+            touched[:self.touched.size] = self.touched
+            self.touched = touched
+        return np.asarray(cols, dtype=np.int64)
+
+    def _cover(self, hour: int) -> None:
+        """Make rows exist through local epoch ``hour``, dropping rows past the history window."""
+        if self.start is None:
+            self.start = hour
+        keep = HISTORY_DAYS * HOURS
+        if hour - self.start + 1 > keep + HOURS:
+            drop = hour - self.start + 1 - keep
+            self.counts = self.counts[drop:]
+            self.start += drop
+        rows = hour - self.start + 1
+        if rows > self.counts.shape[0]:
+            grown = np.zeros((max(rows, min(2 * self.counts.shape[0], keep + HOURS)), self.counts.shape[1]))
+            grown[:self.counts.shape[0]] = self.counts
+            self.counts = grown
+
+    def refresh(self, path=JOURNAL_PATH) -> int:
+        """Add records journaled since the watermark; returns how many."""
+        if self.watermark > journal_size(path):
+            self.__init__(self.utc_offset)
+        ts, keys, qty = [], [], []
+        records = 0
+        for offset, record in replay(path, self.watermark):
+            ts.append(record["ts"])
+            keys.append(ORDERS)
+            qty.append(1.0)
+            for line in record.get("lines", []):
+                ts.append(record["ts"])
+                keys.append(("item", line["item"]))
+                qty.append(float(line["qty"]))
+            self.watermark = offset
+            records += 1
+        if ts:
+            cols = self.columns(keys)
+            hours = self.local_hours(np.asarray(ts, dtype=float))
+            if self.start is None:
+                self.start = int(hours.min())
+            self._cover(int(hours.max()))
+            rows = hours - self.start
+            kept = rows >= 0  # older than the history window
+            np.add.at(self.counts, (rows[kept], cols[kept]), np.asarray(qty)[kept])
+            self.touched[np.unique(cols)] = self.watermark
+        return records
+
+    def window(self, hour: int) -> Tuple[np.ndarray, int]:
+        """Closed hours before local epoch ``hour`` (hours x series) and the hour of row 0."""
+        self._cover(hour)
+        return self.counts[:hour - self.start, :self.size], self.start
+
+
+class SeasonalFits:
+    """Cached Holt-Winters parameters and state for series sharing one season length."""
+
+    def __init__(self, m: int):
+        self.m = m
+        self.cols = np.zeros(0, dtype=np.int64)  # history columns, in fit order
+        self.params = np.zeros((0, 3))
+        self.level = np.zeros(0)
+        self.trend = np.zeros(0)
+        self.seasonal = np.zeros((m, 0))
+        self.offset = np.zeros(0, dtype=np.int64)  # journal offset each fit has seen
+        self.through: Optional[int] = None  # first local hour not yet folded in
+        self.refits = 0
+
+    def update(self, history: DemandHistory, cols: np.ndarray, hour: int, workers: Optional[int] = None) -> None:
+        """Bring every series in ``cols`` up to local epoch ``hour``.
+
+        Series with new data (or none fitted yet) are refit from the whole window; the
+        others roll their cached state forward over the hours closed since the last update.
+        """
+        y, start = history.window(hour)
+        if self.through is None or self.through < start or not np.array_equal(self.cols, cols[:self.cols.size]):
+            self.__init__(self.m)
+        known = self.cols.size
+        if known and self.through < hour:
+            recent = y[self.through - start:, self.cols]
+            a, b, g = self.params.T
+            self.level, self.trend, _ = _smooth(recent, self.through, self.m, a, b, g, self.level, self.trend, self.seasonal)
+        grown = cols.size - known
+        self.cols = cols
+        self.params = np.concatenate([self.params, np.zeros((grown, 3))])
+        self.level = np.concatenate([self.level, np.zeros(grown)])
+        self.trend = np.concatenate([self.trend, np.zeros(grown)])
+        self.seasonal = np.concatenate([self.seasonal, np.zeros((self.m, grown))], axis=1)
+        self.offset = np.concatenate([self.offset, np.full(grown, -1, dtype=np.int64)])
+        self.through = hour
+        stale = np.flatnonzero(history.touched[cols] != self.offset)
+        if stale.size:
+            params, level, trend, seasonal = fit_series(y[:, cols[stale]], start, self.m, workers)
+            self.params[stale], self.level[stale], self.trend[stale] = params, level, trend
+            self.seasonal[:, stale] = seasonal
+            self.offset[stale] = history.touched[cols[stale]]
+            self.refits += stale.size
+
+    def forecast(self, horizon: int) -> np.ndarray:
+        return project(self.level, self.trend, self.seasonal, self.through, horizon)
+
+
+def weekday_matrix(values: np.ndarray, start: int) -> np.ndarray:
+    """7 x 24 (Mon..Sun x hour) layout of a week of hourly values starting at local hour ``start``."""
+    hours = start + np.arange(values.size)
+    out = np.zeros((DAYS, HOURS))
+    out[(hours // HOURS + 3) % DAYS, hours % HOURS] = values
+    return out
+
+
+_HISTORY: Optional[DemandHistory] = None
+_FITS: dict = {}  # group -> SeasonalFits
+_RESULT: Optional[tuple] = None  # (key, result)
+_LOCK = threading.Lock()
+
+
+def demand_forecast(now: Optional[float] = None, workers: Optional[int] = None) -> Optional[dict]:
+    """Forecast from journaled orders, or None with less than a day of history.
+
+    Returns ``start`` (local epoch hour of the first forecast hour), ``orders`` (hourly
+    expected orders for the next week), ``heatmap`` (the same week as Mon..Sun x hour),
+    ``items`` (``name``, ``next_24h`` expected quantity) and the store ``season`` length
+    in hours. Cached until new orders are journaled or an hour closes.
+    """
+    global _HISTORY, _RESULT
+    with _LOCK:
+        if _HISTORY is None:
+            _HISTORY = DemandHistory()
+        history = _HISTORY
+        history.refresh()
+        hour = int(history.local_hours(int(now if now is not None else time.time())))
+        key = (history.watermark, hour)
+        if _RESULT is not None and _RESULT[0] == key:
+            return _RESULT[1]
+        if history.start is None or hour - history.start < HOURS:
+            return None
+        y, _ = history.window(hour)
+        store_m = WEEK if y.shape[0] >= 2 * WEEK else HOURS
+        if _FITS.get("store") is None or _FITS["store"].m != store_m:
+            _FITS["store"] = SeasonalFits(store_m)
+        _FITS.setdefault("items", SeasonalFits(HOURS))
+        store = _FITS["store"]
+        store.update(history, history.columns([ORDERS]), hour, workers)
+        items = [k for k in history.keys if k[0] == "item"]
+        _FITS["items"].update(history, history.columns(items), hour, workers)
+        orders = store.forecast(HORIZON)[:, 0]
+        result = {
+            "start": hour,
+            "orders": orders,
+            "heatmap": weekday_matrix(orders, hour),
+            "items": pd.DataFrame(
+                {
+                    "name": [name for _, name in items],
+                    "next_24h": _FITS["items"].forecast(HOURS).sum(axis=0) if items else np.zeros(0),
+                }
+            ),
+            "season": store_m,
+        }
+        _RESULT = (key, result)
+    return result
@@ -0,0 +1,93 @@
+"""Day-of-week x hour-of-day demand heatmap built from real order timestamps.
+
+``DemandHeatmap`` keeps a (days x 24) matrix of order counts per calendar day, added
+to with one ``bincount`` per batch of new timestamps. A window query folds the
+selected days onto weekdays (Mon..Sun) with ``np.add.at``; results are cached per
+window until more orders arrive. No Python loop touches individual orders.
+"""
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from utils.timebucket import DAYS, HOURS, SECONDS_PER_DAY, buckets, local_offset, order_times
+
+
+WEEKDAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class DemandHeatmap:
+    """Incrementally updated per-day hour histogram with cached weekday folds."""
+
+    def __init__(self, utc_offset: Optional[int] = None):
+        self.utc_offset = utc_offset  # None: local time per timestamp, DST included
+        self.day0 = None
+        self.daily = np.zeros((0, HOURS), dtype=np.int64)
+        self.consumed = 0
+        self._cache: dict = {}
+
+    def update(self, ts) -> None:
+        """Bin a batch of epoch timestamps into the per-day matrix."""
+        ts = np.asarray(ts)
+        if ts.size == 0:
+            return
+        b = buckets(ts, self.utc_offset)
+        day, hour = b["day"], b["hour"]
+        lo, hi = int(day.min()), int(day.max())
+        if self.day0 is None:
+            self.day0 = lo
+        if lo < self.day0:
+            self.daily = np.vstack([np.zeros((self.day0 - lo, HOURS), dtype=np.int64), self.daily])
+            self.day0 = lo
+        rows = hi - self.day0 + 1
+        if rows > self.daily.shape[0]:
+            grown = np.zeros((max(rows, 2 * self.daily.shape[0]), HOURS), dtype=np.int64)
+            grown[:self.daily.shape[0]] = self.daily
+            self.daily = grown
+        flat = (day - self.day0) * HOURS + hour
+        counts = np.bincount(flat, minlength=rows * HOURS)
+        self.daily[:rows] += counts.reshape(rows, HOURS)
+        self._cache.clear()
+
+    def matrix(self, start_day: int, end_day: int) -> np.ndarray:
+        """7 x 24 order counts for local epoch days in ``[start_day, end_day)``."""
+        key = (start_day, end_day)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        out = np.zeros((DAYS, HOURS), dtype=np.int64)
+        if self.day0 is not None:
+            lo = max(start_day, self.day0) - self.day0
+            hi = min(end_day - self.day0, self.daily.shape[0])
+            if hi > lo:
+                days = np.arange(lo, hi) + self.day0
+                np.add.at(out, (days + 3) % DAYS, self.daily[lo:hi])
+        out.setflags(write=False)
+        self._cache[key] = out
+        return out
+
+
+_HEATMAP: Optional[DemandHeatmap] = None
+_LOCK = threading.Lock()
+
+
+def demand_heatmap(days: int = 28, now: Optional[float] = None) -> Optional[np.ndarray]:
+    """Weekday x hour order counts over the last ``days`` of journaled orders (None if none)."""
+    global _HEATMAP
+    store = order_times()
+    with _LOCK:
+        if _HEATMAP is None:
+            _HEATMAP = DemandHeatmap()
+        heat = _HEATMAP
+        if store.size < heat.consumed:
+            heat.__init__(heat.utc_offset)
+        if store.size > heat.consumed:
+            heat.update(store.values[heat.consumed:store.size])
+            heat.consumed = store.size
+        if heat.day0 is None:
+            return None
+        now = int(now if now is not None else time.time())
+        today = (now + (local_offset(now) if heat.utc_offset is None else heat.utc_offset)) // SECONDS_PER_DAY
+        matrix = heat.matrix(today - days + 1, today + 1)
+    return matrix if matrix.any() else None
@@ -0,0 +1,288 @@
+"""Durable, append-only order journal shared by POS Lite and the QR menu.
+
+Records are length-prefixed frames: an 8-byte header (payload length, CRC-32) followed
+by a compact UTF-8 JSON payload. Writers from every session hand frames to one
+background thread per process which group-commits them (single ``write`` + ``fsync``
+per batch), so concurrent checkouts share one disk flush. On open, a torn or
+corrupt tail left by a crash is truncated back to the last complete record.
+
+Byte offsets double as watermarks: ``replay(start=offset)`` yields only records
+appended after ``offset``, which lets consumers resume from where they stopped.
+"""
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JOURNAL_PATH = BASE_DIR / "data" / "orders.journal"
+
+HEADER = struct.Struct("<II")
+MAX_RECORD = 16 * 1024 * 1024
+READ_CHUNK = 1 << 20
+
+
+@contextmanager
+def _locked(fd: int):
+    """Exclusive advisory lock so several server processes can share a journal."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def encode_record(record: Mapping) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _scan(buf, base: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield (start, end, payload_start) for each valid frame in ``buf``; stops at the first bad one."""
+    pos, size = 0, len(buf)
+    while pos + HEADER.size <= size:
+        length, crc = HEADER.unpack_from(buf, pos)
+        body = pos + HEADER.size
+        if length > MAX_RECORD or body + length > size:
+            return
+        if zlib.crc32(buf[body:body + length]) != crc:
+            return
+        yield base + pos, base + body + length, body
+        pos = body + length
+
+
+def replay(path: Path = JOURNAL_PATH, start: int = 0) -> Iterator[Tuple[int, dict]]:
+    """Sequentially yield ``(next_offset, record)`` for every complete record after ``start``.
+
+    ``next_offset`` is the watermark to pass back as ``start`` to resume after that record.
+    An incomplete tail (e.g. a batch still being written) ends the iteration quietly.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        f.seek(start)
+        offset = start
+        pending = b""
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return
+            buf = pending + chunk if pending else chunk
+            view = memoryview(buf)
+            consumed = 0
+            for _, end, body in _scan(view, offset):
+                yield end, json.loads(bytes(view[body:end - offset]))
+                consumed = end - offset
+            offset += consumed
+            pending = buf[consumed:]
+            if len(pending) >= HEADER.size:
+                length, _ = HEADER.unpack_from(pending, 0)
+                if length > MAX_RECORD or len(pending) >= HEADER.size + length:
+                    return  # complete but corrupt frame: nothing valid follows
+
+
+def recover(path: Path) -> int:
+    """Truncate a torn/corrupt tail and return the end offset of the last valid record."""
+    if not path.exists():
+        return 0
+    fd = os.open(path, os.O_RDWR)
+    try:
+        with _locked(fd):
+            good = 0
+            for good, _ in replay(path):
+                pass
+            if os.fstat(fd).st_size > good:
+                os.ftruncate(fd, good)
+                os.fsync(fd)
+            return good
+    finally:
+        os.close(fd)
+
+
+class _Ticket:
+    __slots__ = ("event", "offset", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.offset = None
+        self.error = None
+
+
+class OrderJournal:
+    """Process-wide appender with group-commit fsync batching."""
+
+    def __init__(self, path: Path = JOURNAL_PATH, commit_interval: float = 0.002, max_batch: int = 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        recover(self.path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._queue: List[Tuple[bytes, _Ticket]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._failed: Optional[OSError] = None
+        self._writer = threading.Thread(target=self._run, name="order-journal", daemon=True)
+        self._writer.start()
+
+    def append(self, record: Mapping, wait: bool = True) -> Optional[int]:
+        """Queue ``record`` for the next group commit.
+
+        With ``wait`` (default) block until it is fsynced and return its end offset.
+        """
+        ticket = _Ticket()
+        frame = encode_record(record)
+        with self._cond:
+            if self._closed:
+                raise ValueError("journal is closed")
+            if self._failed is not None:
+                raise self._failed
+            self._queue.append((frame, ticket))
+            self._cond.notify()
+        if not wait:
+            return None
+        ticket.event.wait()
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.offset
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+            # Give concurrent checkouts a moment to join this commit group.
+            if self.commit_interval and len(self._queue) < self.max_batch:
+                time.sleep(self.commit_interval)
+            with self._cond:
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[bytes, _Ticket]]):
+        data = b"".join(frame for frame, _ in batch)
+        error = self._failed
+        end = None
+        if error is None:
+            try:
+                with _locked(self._fd):
+                    size = os.fstat(self._fd).st_size
+                    try:
+                        view = memoryview(data)
+                        while view:
+                            written = os.write(self._fd, view)
+                            view = view[written:]
+                        os.fsync(self._fd)
+                        end = os.lseek(self._fd, 0, os.SEEK_CUR)
+                    except OSError as exc:
+                        error = exc
+                        # Drop the torn batch so later commits don't land behind a bad
+                        # frame (recover() would truncate them away); if that fails too,
+                        # refuse further appends.
+                        try:
+                            os.ftruncate(self._fd, size)
+                        except OSError:
+                            self._failed = exc
+            except OSError as exc:
+                error = exc
+        offset = end - len(data) if end is not None else None
+        for frame, ticket in batch:
+            if error is None:
+                offset += len(frame)
+                ticket.offset = offset
+            ticket.error = error
+            ticket.event.set()
+
+    def close(self):
+        """Flush everything queued, stop the writer and close the file."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        os.close(self._fd)
+
+
+_JOURNALS: dict = {}
+_LOCK = threading.Lock()
+
+
+def get_journal(path: Path = JOURNAL_PATH) -> OrderJournal:
+    """Return the shared journal for ``path``, opening it on first use."""
+    path = Path(path)
+    journal = _JOURNALS.get(path)
+    if journal is None:
+        with _LOCK:
+            journal = _JOURNALS.get(path)
+            if journal is None:
+                journal = _JOURNALS[path] = OrderJournal(path)
+    return journal
+
+
+def journal_size(path: Path = JOURNAL_PATH) -> int:
+    """Current end offset of the journal (0 when it does not exist yet)."""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def record_order(
+    source: str,
+    lines: List[Mapping],
+    total: float,
+    method: Optional[str] = None,
+    order_id: Optional[str] = None,
+    path: Path = JOURNAL_PATH,
+) -> dict:
+    """Durably journal a completed checkout and return the stored record.
+
+    Each line carries ``item``, ``qty``, ``price`` and optionally ``category`` and ``mods``
+    (QR ``options`` are stored as ``mods`` so both flows share one shape).
+    """
+    record = {
+        "id": order_id or uuid.uuid4().hex[:8].upper(),
+        "ts": time.time(),
+        "source": source,
+        "method": method,
+        "total": round(float(total), 2),
+        "lines": [
+            {
+                "item": line["item"],
+                "qty": int(line["qty"]),
+                "price": float(line["price"]),
+                "category": line.get("category"),
+                "mods": dict(line.get("mods") or line.get("options") or {}),
+            }
+            for line in lines
+        ],
+    }
+    get_journal(path).append(record)
+    return record
+
+
+@atexit.register
+def _close_all():
+    for journal in list(_JOURNALS.values()):
+        journal.close()
@@ -1,21 +1,130 @@
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
+
+import pandas as pd
+
+from utils import snapshot
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+ENCODINGS = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+# Process-wide parse cache shared by every Streamlit session:
+# path -> (mtime_ns, size, frozen value). Encodings that worked are remembered
+# separately so a file edited in place is re-decoded with the right codec first.
+_CACHE: dict = {}
+_ENCODING_HINTS: dict = {}
+_LOCK = threading.Lock()
+
+
+class FrozenDict(dict):
+    """Read-only dict returned by the loader so pages cannot corrupt the shared copy."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("load_json data is read-only; use thaw() for a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into read-only containers (dict -> FrozenDict, list -> tuple)."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of loader data (dicts and lists)."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
 
-def load_json(filename: str) -> Any:
-    """Load demo JSON data from the demo_data folder with relaxed encoding handling."""
-    data_path = BASE_DIR / "demo_data" / filename
-    encodings = ("utf-8", "utf-8-sig", "cp1252", "latin-1")
+
+def _decode(path: Path, raw: bytes) -> Any:
+    hint = _ENCODING_HINTS.get(path)
+    encodings = (hint,) + tuple(e for e in ENCODINGS if e != hint) if hint else ENCODINGS
     last_error = None
     for enc in encodings:
         try:
-            with data_path.open("r", encoding=enc) as f:
-                return json.load(f)
+            data = json.loads(raw.decode(enc))
         except Exception as exc:
             last_error = exc
             continue
+        _ENCODING_HINTS[path] = enc
+        return data
     raise last_error
+
+
+def data_path(filename: str, data_dir: Optional[Path] = None) -> Path:
+    """Resolve a data file name to its path under ``data_dir`` (default: demo_data/)."""
+    return Path(data_dir or BASE_DIR / "demo_data") / filename
+
+
+def load_json(filename: str, data_dir: Optional[Path] = None) -> Any:
+    """Load demo JSON data from the demo_data folder with relaxed encoding handling.
+
+    Parsed files are cached per process and keyed on path + mtime + size, so reruns
+    only pay for an ``os.stat``. The result is frozen; call ``thaw`` before mutating.
+    ``data_dir`` reads the same file name from another folder (e.g. a branch export).
+    """
+    path = data_path(filename, data_dir)
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    value = freeze(_decode(path, path.read_bytes()))
+    with _LOCK:
+        _CACHE[path] = (key, value)
+    return value
+
+
+def clear_cache() -> None:
+    """Drop every cached file (encoding hints are kept)."""
+    with _LOCK:
+        _CACHE.clear()
+
+
+def records_frame(records: Any) -> pd.DataFrame:
+    """Build a DataFrame from JSON records, or from a flat mapping as ``key``/``value`` columns."""
+    if isinstance(records, dict):
+        return pd.DataFrame({"key": list(records.keys()), "value": list(records.values())})
+    return pd.DataFrame(list(records))
+
+
+def load_frame(filename: str, table: str = snapshot.ROOT_TABLE, default: Optional[list] = None) -> pd.DataFrame:
+    """Load one table of a demo data file as a DataFrame.
+
+    Served zero-copy from the compiled columnar snapshot (``python -m utils.snapshot``)
+    when one exists and is fresh; otherwise built from the cached JSON. ``default``
+    records are used when the source has no such table.
+    """
+    frame = snapshot.read_table(data_path(filename), table)
+    if frame is not None:
+        return frame
+    data = load_json(filename)
+    if table == snapshot.ROOT_TABLE and isinstance(data, (list, tuple)):
+        return records_frame(data)
+    if isinstance(data, dict) and table in data:
+        return records_frame(data[table])
+    if default is not None:
+        return records_frame(default)
+    raise KeyError(f"{filename} has no table {table!r}")
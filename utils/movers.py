@@ -0,0 +1,206 @@
+"""Incremental fast/slow mover index over journaled order lines.
+
+Per menu item the index keeps the last sale time and the quantity sold in each of the
+last ``WINDOW_HOURS`` hours, as one (hour ring x item) array. Running totals for the
+whole window and for the last ``RECENT_HOURS`` are adjusted as sales arrive and as
+hours roll out of the ring, so each order line costs O(1) and so does looking up one
+item's days without a sale or its velocity (recent hourly rate over the window's
+average). Ranked fast and slow mover lists are one vectorized pass over those arrays.
+
+``live_movers`` returns them in the shape of ``ai.json``'s ``fast_movers`` and
+``slow_movers``, falling back to those lists until an order has been journaled.
+"""
+import threading
+import time
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.journal import JOURNAL_PATH, journal_size, replay
+from utils.timebucket import HOURS, SECONDS_PER_DAY, SECONDS_PER_HOUR, to_epoch
+
+
+WINDOW_HOURS = 7 * HOURS
+RECENT_HOURS = 3
+FAST_RATIO = 1.5  # recent rate at least 1.5x the window average
+MIN_RECENT_QTY = 3
+SLOW_DAYS = 1
+TOP_MOVERS = 3
+
+
+class MoverIndex:
+    """Last-sale times and rolling hourly sales per item, updated one order line at a time."""
+
+    def __init__(self, catalog: Sequence[str] = (), capacity: int = 64):
+        self.index: dict = {}  # item name -> column
+        self.names: list = []
+        self.ring = np.zeros((WINDOW_HOURS, capacity))  # row = epoch hour % WINDOW_HOURS
+        self.window = np.zeros(capacity)  # quantity over the last WINDOW_HOURS hours
+        self.recent = np.zeros(capacity)  # quantity over the last RECENT_HOURS hours
+        self.last_sale = np.full(capacity, -np.inf)
+        self.hour: Optional[int] = None  # epoch hour of the newest ring row
+        self.first_hour: Optional[int] = None
+        self.watermark = 0
+        self.columns(catalog)
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    def columns(self, names: Iterable[str]) -> np.ndarray:
+        """Column of each item, registering unseen ones."""
+        cols = []
+        for name in names:
+            col = self.index.get(name)
+            if col is None:
+                col = self.index[name] = len(self.names)
+                self.names.append(name)
+            cols.append(col)
+        if self.size > self.window.size:
+            capacity = max(self.size, 2 * self.window.size)
+            ring = np.zeros((WINDOW_HOURS, capacity))
+            ring[:, :self.window.size] = self.ring
+            self.ring = ring
+            for name, fill in (("window", 0.0), ("recent", 0.0), ("last_sale", -np.inf)):
+                old = getattr(self, name)
+                grown = np.full(capacity, fill)
+                grown[:old.size] = old
+                setattr(self, name, grown)
+        return np.asarray(cols, dtype=np.int64)
+
+    def advance(self, hour: int) -> None:
+        """Roll the ring forward to epoch ``hour``, dropping the hours that leave each window."""
+        if self.hour is None:
+            self.hour = hour
+            if self.first_hour is None:
+                self.first_hour = hour
+            return
+        if hour <= self.hour:
+            return
+        if hour - self.hour >= WINDOW_HOURS:
+            self.ring[:] = 0
+            self.window[:] = 0
+            self.recent[:] = 0
+        else:
+            for h in range(self.hour + 1, hour + 1):
+                self.recent -= self.ring[(h - RECENT_HOURS) % WINDOW_HOURS]
+                row = h % WINDOW_HOURS
+                self.window -= self.ring[row]
+                self.ring[row] = 0
+        self.hour = hour
+
+    def add(self, ts, cols, qty) -> None:
+        """Record sales (epoch seconds, item column, quantity)."""
+        ts = to_epoch(ts)
+        if ts.size == 0:
+            return
+        cols = np.asarray(cols, dtype=np.int64)
+        qty = np.asarray(qty, dtype=float)
+        hours = ts // SECONDS_PER_HOUR
+        first = int(hours.min())
+        self.first_hour = first if self.first_hour is None else min(self.first_hour, first)
+        self.advance(int(hours.max()))
+        np.maximum.at(self.last_sale, cols, ts)
+        live = hours > self.hour - WINDOW_HOURS
+        np.add.at(self.ring, (hours[live] % WINDOW_HOURS, cols[live]), qty[live])
+        self.window += np.bincount(cols[live], weights=qty[live], minlength=self.window.size)
+        near = hours > self.hour - RECENT_HOURS
+        self.recent += np.bincount(cols[near], weights=qty[near], minlength=self.recent.size)
+
+    def refresh(self, path=JOURNAL_PATH) -> int:
+        """Add order lines journaled since the watermark; returns how many records."""
+        if self.watermark > journal_size(path):
+            self.__init__(self.names)
+        ts, items, qty = [], [], []
+        records = 0
+        for offset, record in replay(path, self.watermark):
+            for line in record.get("lines", []):
+                ts.append(record["ts"])
+                items.append(line["item"])
+                qty.append(line["qty"])
+            self.watermark = offset
+            records += 1
+        if ts:
+            self.add(np.asarray(ts, dtype=float), self.columns(items), qty)
+        return records
+
+    def _days_idle(self, cols, now: float) -> np.ndarray:
+        # Items never sold count from when tracking began.
+        since = self.first_hour * SECONDS_PER_HOUR if self.first_hour is not None else now
+        return (now - np.maximum(self.last_sale[cols], since)) / SECONDS_PER_DAY
+
+    def _ratios(self, cols) -> np.ndarray:
+        span = min(self.hour - self.first_hour + 1, WINDOW_HOURS) if self.hour is not None else 0
+        if span <= RECENT_HOURS:
+            return np.ones(len(cols))
+        window = np.maximum(self.window[cols], 0)
+        recent = np.maximum(self.recent[cols], 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(window > 0, (recent / RECENT_HOURS) / (window / span), 1.0)
+
+    def days_without_sale(self, name: str, now: Optional[float] = None) -> Optional[float]:
+        col = self.index.get(name)
+        if col is None:
+            return None
+        return float(self._days_idle([col], now if now is not None else time.time())[0])
+
+    def velocity(self, name: str) -> Optional[float]:
+        """Last ``RECENT_HOURS`` hourly rate over the window average (1.0 when unknown)."""
+        col = self.index.get(name)
+        if col is None:
+            return None
+        return float(self._ratios([col])[0])
+
+    def fast_movers(self, n: int = TOP_MOVERS) -> list:
+        """Items selling at least ``FAST_RATIO`` times their usual rate, fastest first."""
+        cols = np.arange(self.size)
+        ratio = self._ratios(cols)
+        hot = np.flatnonzero((ratio >= FAST_RATIO) & (self.recent[:self.size] >= MIN_RECENT_QTY))
+        top = hot[np.argsort(-ratio[hot], kind="stable")[:n]]
+        return [{"item": self.names[c], "ratio": float(ratio[c])} for c in top]
+
+    def slow_movers(self, n: int = TOP_MOVERS, now: Optional[float] = None) -> list:
+        """Items without a sale for at least ``SLOW_DAYS`` days, longest first."""
+        days = self._days_idle(np.arange(self.size), now if now is not None else time.time())
+        idle = np.flatnonzero(days >= SLOW_DAYS)
+        top = idle[np.argsort(-days[idle], kind="stable")[:n]]
+        return [{"item": self.names[c], "days": float(days[c])} for c in top]
+
+
+_INDEX: Optional[MoverIndex] = None
+_LOCK = threading.Lock()
+
+
+def mover_index(catalog: Sequence[str] = ()) -> MoverIndex:
+    """Process-wide index caught up with the journal tail (``catalog`` items are always tracked)."""
+    global _INDEX
+    with _LOCK:
+        if _INDEX is None:
+            _INDEX = MoverIndex(catalog)
+        else:
+            _INDEX.columns(catalog)
+        _INDEX.refresh()
+        _INDEX.advance(int(time.time()) // SECONDS_PER_HOUR)
+        return _INDEX
+
+
+def live_movers(static_fast: list, static_slow: list, catalog: Sequence[str] = (), n: int = TOP_MOVERS) -> Tuple[list, list]:
+    """Fast and slow movers shaped like ``ai.json`` (with a ``bar`` width), or the static lists."""
+    index = mover_index(catalog)
+    with _LOCK:
+        if index.watermark == 0:
+            return static_fast, static_slow
+        fast = index.fast_movers(n)
+        slow = index.slow_movers(n)
+    top_ratio = max((f["ratio"] for f in fast), default=1.0)
+    top_days = max((s["days"] for s in slow), default=1.0)
+    return (
+        [
+            {"item": f["item"], "rate": f"{f['ratio']:.1f}x faster than usual", "bar": round(90 * f["ratio"] / top_ratio)}
+            for f in fast
+        ],
+        [
+            {"item": s["item"], "days_no_sale": int(s["days"]), "bar": round(90 * s["days"] / top_days)}
+            for s in slow
+        ],
+    )
@@ -0,0 +1,590 @@
+"""Small streaming PDF writer shared by every export in the suite.
+
+``PDFDocument`` writes objects into a byte buffer as soon as they are complete and
+records their offsets, so the xref table is produced from real positions rather
+than recomputed by hand. Content flows top to bottom and breaks onto new pages
+automatically; tables repeat their header row after a break. Line, bar and donut charts are drawn
+as native vector paths from the same data the pages plot. Page content streams
+are Flate-compressed, text uses the built-in Helvetica fonts with WinAnsi
+(cp1252) encoding, and sections become PDF outline entries (bookmarks). An optional
+brand name and logo are drawn into the header band of every page.
+"""
+import io
+import math
+import zlib
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 40
+HEADER_HEIGHT = 60
+FOOTER_HEIGHT = 30
+
+BLACK = (0, 0, 0)
+WHITE = (1, 1, 1)
+GOLD = (0.878, 0.705, 0.333)
+GREY = (0.45, 0.45, 0.45)
+RULE = (0.85, 0.85, 0.85)
+STRIPE = (0.96, 0.96, 0.96)
+HEADER_FILL = (0.9, 0.9, 0.9)
+BLUE = (0.106, 0.463, 1.0)
+LIGHT_BLUE = (0.373, 0.694, 1.0)
+PURPLE = (0.612, 0.486, 1.0)
+PALETTE = [BLUE, GOLD, LIGHT_BLUE, PURPLE]
+
+Color = Tuple[float, float, float]
+
+# Helvetica / Helvetica-Bold advance widths (1/1000 em) for codes 32..126.
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+
+
+def _width_table(ascii_widths: List[int]) -> List[int]:
+    table = [556] * 256
+    table[32:127] = ascii_widths
+    table[0x85] = 1000  # ellipsis
+    table[0x95] = 350  # bullet
+    table[0x97] = 1000  # em dash
+    return table
+
+
+_WIDTHS = {False: _width_table(_HELVETICA), True: _width_table(_HELVETICA_BOLD)}
+_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)", "\r": " ", "\n": " "})
+
+
+def encode_text(text: str) -> str:
+    """Map ``text`` onto WinAnsi; unsupported characters become "?". Returned as latin-1 str."""
+    return str(text).encode("cp1252", errors="replace").decode("latin-1")
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    """Rendered width in points of ``text`` at ``size``."""
+    widths = _WIDTHS[bold]
+    return sum(map(widths.__getitem__, encode_text(text).encode("latin-1"))) * size / 1000
+
+
+def fit_text(text: str, width: float, size: float, bold: bool = False) -> str:
+    """``text`` truncated with an ellipsis so it renders within ``width``."""
+    text = str(text)
+    if text_width(text, size, bold) <= width:
+        return text
+    widths = _WIDTHS[bold]
+    budget = width * 1000 / size - widths[0x85]
+    used = 0
+    raw = encode_text(text).encode("latin-1")
+    for i, code in enumerate(raw):
+        used += widths[code]
+        if used > budget:
+            return text[:i] + "…"
+    return text
+
+
+def wrap_text(text: str, width: float, size: float, bold: bool = False) -> List[str]:
+    """Greedy word wrap of ``text`` into lines no wider than ``width``."""
+    lines, current = [], ""
+    for word in str(text).split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, size, bold) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current or not lines:
+        lines.append(fit_text(current, width, size, bold))
+    return lines
+
+
+def format_cell(value) -> str:
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return "" if value is None else str(value)
+
+
+def _numeric(values: Iterable) -> bool:
+    present = [v for v in values if v not in (None, "")]
+    return bool(present) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present)
+
+
+def _logo_image(data: bytes, max_px: int = 240):
+    """Decode a PNG/JPEG logo into (width, height, Flate-compressed RGB), or None if unusable."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.thumbnail((max_px, max_px))
+        if img.mode != "RGB":
+            rgba = img.convert("RGBA")
+            img = Image.new("RGB", rgba.size, BLACK)
+            img.paste(rgba, mask=rgba.getchannel("A"))
+    except Exception:
+        return None
+    return img.width, img.height, zlib.compress(img.tobytes(), 6)
+
+
+def _tint(color: Color, amount: float) -> Color:
+    """``color`` mixed with white (``amount`` 0 = unchanged, 1 = white)."""
+    return tuple(c + (1 - c) * amount for c in color)
+
+
+def nice_ticks(top: float, count: int = 4) -> List[float]:
+    """Round axis ticks from 0 covering ``top`` (e.g. 0, 100, 200, 300, 400)."""
+    if top <= 0:
+        return [0.0, 1.0]
+    raw = top / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    return [step * i for i in range(int(math.ceil(top / step)) + 1)]
+
+
+def _short(value: float) -> str:
+    if abs(value) >= 1000:
+        return f"{value / 1000:,.1f}k".replace(".0k", "k")
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.1f}"
+
+
+def _arc(cx: float, cy: float, r: float, a0: float, a1: float, move: bool) -> List[str]:
+    """Path ops for a circular arc from angle ``a0`` to ``a1`` (radians) as cubic Béziers."""
+    segments = max(1, int(math.ceil(abs(a1 - a0) / (math.pi / 2))))
+    step = (a1 - a0) / segments
+    k = 4 / 3 * math.tan(step / 4)
+    ops = []
+    x0, y0 = cx + r * math.cos(a0), cy + r * math.sin(a0)
+    ops.append(f"{x0:.2f} {y0:.2f} {'m' if move else 'l'}")
+    for i in range(segments):
+        t0, t1 = a0 + i * step, a0 + (i + 1) * step
+        x1, y1 = cx + r * math.cos(t1), cy + r * math.sin(t1)
+        c1x, c1y = x0 - k * r * math.sin(t0), y0 + k * r * math.cos(t0)
+        c2x, c2y = x1 + k * r * math.sin(t1), y1 - k * r * math.cos(t1)
+        ops.append(f"{c1x:.2f} {c1y:.2f} {c2x:.2f} {c2y:.2f} {x1:.2f} {y1:.2f} c")
+        x0, y0 = x1, y1
+    return ops
+
+
+def _rgb(color: Color, op: str) -> str:
+    return f"{color[0]:.3f} {color[1]:.3f} {color[2]:.3f} {op}"
+
+
+class PDFDocument:
+    """Paginated document: headings, paragraphs and tables flowed onto letter pages."""
+
+    def __init__(
+        self,
+        title: str,
+        subtitle: str = "",
+        compress: bool = True,
+        author: str = "Quantex",
+        brand: str = "",
+        logo: Optional[bytes] = None,
+    ):
+        self.title = title
+        self.subtitle = subtitle
+        self.brand = brand
+        self.compress = compress
+        self.author = author
+        self.created = datetime.now()
+        self._buf = io.BytesIO()
+        self._offsets = {}
+        self._next_obj = 1
+        self._pages: List[int] = []
+        self._outline: List[Tuple[str, int, float]] = []
+        self._ops: Optional[List[str]] = None
+        self._result: Optional[bytes] = None
+        self.y = 0.0
+
+        self._buf.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._catalog = self._alloc()
+        self._pages_root = self._alloc()
+        self._fonts = {}
+        for name, base in (("F1", "Helvetica"), ("F2", "Helvetica-Bold")):
+            num = self._alloc()
+            self._write_obj(num, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>")
+            self._fonts[name] = num
+        self._logo = None
+        image = _logo_image(logo) if logo else None
+        if image is not None:
+            width, height, data = image
+            num = self._alloc()
+            self._write_obj(
+                num,
+                f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceRGB "
+                f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(data)} >>",
+                data,
+            )
+            self._logo = (num, width, height)
+
+    # -- low-level object output -------------------------------------------------
+
+    def _alloc(self) -> int:
+        num = self._next_obj
+        self._next_obj += 1
+        return num
+
+    def _write_obj(self, num: int, body, stream: Optional[bytes] = None) -> None:
+        self._offsets[num] = self._buf.tell()
+        if isinstance(body, str):
+            body = body.encode("latin-1")
+        self._buf.write(f"{num} 0 obj\n".encode("ascii"))
+        self._buf.write(body)
+        if stream is not None:
+            self._buf.write(b"\nstream\n")
+            self._buf.write(stream)
+            self._buf.write(b"\nendstream")
+        self._buf.write(b"\nendobj\n")
+
+    # -- pages -------------------------------------------------------------------
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages) + (1 if self._ops is not None else 0)
+
+    @property
+    def content_width(self) -> float:
+        return PAGE_WIDTH - 2 * MARGIN
+
+    def _new_page(self) -> None:
+        self._end_page()
+        self._ops = []
+        self._draw_header()
+        self.y = PAGE_HEIGHT - HEADER_HEIGHT - 24
+
+    def _draw_header(self) -> None:
+        top = PAGE_HEIGHT - HEADER_HEIGHT
+        self.rect(0, top, PAGE_WIDTH, HEADER_HEIGHT, BLACK)
+        self.rect(0, top, PAGE_WIDTH, 3, GOLD)
+        self.text(MARGIN, PAGE_HEIGHT - 30, self.title, 18, bold=True, color=WHITE)
+        if self.subtitle:
+            self.text(MARGIN, PAGE_HEIGHT - 48, self.subtitle, 11, color=WHITE)
+        right = PAGE_WIDTH - MARGIN
+        if self._logo is not None:
+            _, width, height = self._logo
+            h = HEADER_HEIGHT - 20
+            w = h * width / height
+            right -= w
+            self._ops.append(f"q {w:.2f} 0 0 {h:.2f} {right:.2f} {top + 10:.2f} cm /Logo Do Q")
+            right -= 10
+        if self.brand:
+            self.text(right - text_width(self.brand, 12, True), PAGE_HEIGHT - 36, self.brand, 12, bold=True, color=GOLD)
+
+    def _draw_footer(self) -> None:
+        number = len(self._pages) + 1
+        stamp = self.created.strftime("%d %b %Y %H:%M")
+        self.text(MARGIN, FOOTER_HEIGHT - 12, f"Generated by {self.author} • {stamp}", 8, color=GREY)
+        label = f"Page {number}"
+        self.text(PAGE_WIDTH - MARGIN - text_width(label, 8), FOOTER_HEIGHT - 12, label, 8, color=GREY)
+
+    def _end_page(self) -> None:
+        if self._ops is None:
+            return
+        self._draw_footer()
+        data = "\n".join(self._ops).encode("latin-1")
+        self._ops = None
+        content = self._alloc()
+        if self.compress:
+            data = zlib.compress(data, 6)
+            self._write_obj(content, f"<< /Length {len(data)} /Filter /FlateDecode >>", data)
+        else:
+            self._write_obj(content, f"<< /Length {len(data)} >>", data)
+        page = self._alloc()
+        fonts = " ".join(f"/{name} {num} 0 R" for name, num in self._fonts.items())
+        resources = f"/Font << {fonts} >>"
+        if self._logo is not None:
+            resources += f" /XObject << /Logo {self._logo[0]} 0 R >>"
+        self._write_obj(
+            page,
+            f"<< /Type /Page /Parent {self._pages_root} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << {resources} >> /Contents {content} 0 R >>",
+        )
+        self._pages.append(page)
+
+    def ensure_space(self, height: float) -> None:
+        """Start a new page unless ``height`` points still fit above the footer."""
+        if self._ops is None or self.y - height < FOOTER_HEIGHT + 12:
+            self._new_page()
+
+    # -- drawing primitives ------------------------------------------------------
+
+    def rect(self, x: float, y: float, w: float, h: float, color: Color) -> None:
+        self._ops.append(f"{_rgb(color, 'rg')} {x:.2f} {y:.2f} {w:.2f} {h:.2f} re f")
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, color: Color = RULE, width: float = 0.5) -> None:
+        self._ops.append(f"{_rgb(color, 'RG')} {width} w {x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S")
+
+    def text(self, x: float, y: float, text: str, size: float = 11, bold: bool = False, color: Color = BLACK) -> None:
+        font = "F2" if bold else "F1"
+        body = encode_text(text).translate(_ESCAPES)
+        self._ops.append(f"BT /{font} {size} Tf {_rgb(color, 'rg')} 1 0 0 1 {x:.2f} {y:.2f} Tm ({body}) Tj ET")
+
+    # -- flowing content ---------------------------------------------------------
+
+    def spacer(self, height: float = 8) -> None:
+        self.ensure_space(height)
+        self.y -= height
+
+    def heading(self, text: str, size: float = 14, color: Color = BLACK) -> None:
+        self.ensure_space(size * 2.4)
+        self.y -= size * 1.4
+        self.text(MARGIN, self.y, text, size, bold=True, color=color)
+        self.line(MARGIN, self.y - 5, MARGIN + 60, self.y - 5, GOLD, 1.5)
+        self.y -= size * 0.8
+
+    def section(self, title: str, new_page: bool = False) -> None:
+        """Heading that also becomes a bookmark; ``new_page`` forces a page break first."""
+        if new_page and self._ops is not None:
+            self._new_page()
+        self.ensure_space(60)
+        self._outline.append((title, len(self._pages), self.y))
+        self.heading(title)
+
+    def paragraph(self, text: str, size: float = 11, bold: bool = False, color: Color = BLACK, indent: float = 0) -> None:
+        leading = size * 1.45
+        for line in wrap_text(text, self.content_width - indent, size, bold):
+            self.ensure_space(leading)
+            self.y -= leading
+            self.text(MARGIN + indent, self.y, line, size, bold, color)
+        self.y -= size * 0.35
+
+    def bullets(self, items: Iterable[str], size: float = 11) -> None:
+        for item in items:
+            self.paragraph(f"• {item}", size=size, indent=8)
+
+    def table(
+        self,
+        columns: Sequence[str],
+        rows: Iterable[Sequence],
+        widths: Optional[Sequence[float]] = None,
+        align: Optional[Sequence[str]] = None,
+        size: float = 9,
+    ) -> None:
+        """Draw ``rows`` under a header row, breaking across pages as needed.
+
+        ``widths`` are relative column weights (default: from the header and first rows);
+        ``align`` holds "l"/"r" per column (default: right for numeric columns).
+        """
+        rows = [list(r) for r in rows]
+        ncols = len(columns)
+        sample = rows[:200]
+        if align is None:
+            align = ["r" if _numeric(r[i] for r in sample) else "l" for i in range(ncols)]
+        cells = [[format_cell(v) for v in r] for r in rows]
+        if widths is None:
+            widths = [
+                max([text_width(columns[i], size, True)] + [text_width(c[i], size) for c in cells[:200]]) + 12
+                for i in range(ncols)
+            ]
+        scale = self.content_width / float(sum(widths))
+        col_w = [w * scale for w in widths]
+        col_x = [MARGIN + sum(col_w[:i]) for i in range(ncols)]
+        row_h = size * 1.9
+        pad = 4
+
+        def draw_row(values, bold, fill=None):
+            self.y -= row_h
+            if fill is not None:
+                self.rect(MARGIN, self.y, self.content_width, row_h, fill)
+            base = self.y + (row_h - size) / 2 + 1.5
+            for i, value in enumerate(values):
+                shown = fit_text(value, col_w[i] - 2 * pad, size, bold)
+                if align[i] == "r":
+                    x = col_x[i] + col_w[i] - pad - text_width(shown, size, bold)
+                else:
+                    x = col_x[i] + pad
+                self.text(x, base, shown, size, bold)
+
+        def draw_header():
+            self.ensure_space(row_h * 2)
+            draw_row(columns, True, HEADER_FILL)
+            self.line(MARGIN, self.y, MARGIN + self.content_width, self.y, GREY)
+
+        draw_header()
+        for idx, values in enumerate(cells):
+            if self.y - row_h < FOOTER_HEIGHT + 12:
+                self._new_page()
+                draw_header()
+            draw_row(values, False, STRIPE if idx % 2 else None)
+        self.y -= 6
+
+    # -- charts ------------------------------------------------------------------
+
+    def _chart_box(self, title: str, height: float) -> Tuple[float, float, float, float]:
+        """Reserve a titled block of ``height`` points; returns the plot area (x, y, w, h)."""
+        self.ensure_space(height + 26)
+        self.y -= 16
+        self.text(MARGIN, self.y, title, 11, bold=True)
+        self.y -= height + 10
+        return MARGIN, self.y, self.content_width, height
+
+    def circle(self, cx: float, cy: float, r: float, color: Color) -> None:
+        ops = _arc(cx, cy, r, 0, 2 * math.pi, True)
+        self._ops.append(f"{_rgb(color, 'rg')} " + " ".join(ops) + " h f")
+
+    def line_chart(
+        self,
+        title: str,
+        labels: Sequence[str],
+        values: Sequence[float],
+        height: float = 170,
+        color: Color = BLUE,
+        highlight: Optional[int] = None,
+        highlight_label: str = "",
+    ) -> None:
+        """Line with shaded area, point markers and value axis; ``highlight`` marks one x index."""
+        if not values:
+            return
+        x, y, w, h = self._chart_box(title, height)
+        ticks = nice_ticks(max(values))
+        top = ticks[-1] or 1
+        axis_w = max(text_width(_short(t), 7) for t in ticks) + 6
+        px, pw, py, ph = x + axis_w, w - axis_w, y + 14, h - 14
+        for t in ticks:
+            ty = py + ph * t / top
+            self.line(px, ty, px + pw, ty, RULE, 0.4)
+            label = _short(t)
+            self.text(px - 4 - text_width(label, 7), ty - 2.5, label, 7, color=GREY)
+        n = len(values)
+        xs = [px + (pw * i / (n - 1) if n > 1 else pw / 2) for i in range(n)]
+        ys = [py + ph * v / top for v in values]
+        area = [f"{xs[0]:.2f} {py:.2f} m"] + [f"{a:.2f} {b:.2f} l" for a, b in zip(xs, ys)] + [f"{xs[-1]:.2f} {py:.2f} l h"]
+        self._ops.append(f"{_rgb(_tint(color, 0.85), 'rg')} " + " ".join(area) + " f")
+        path = [f"{xs[0]:.2f} {ys[0]:.2f} m"] + [f"{a:.2f} {b:.2f} l" for a, b in zip(xs[1:], ys[1:])]
+        self._ops.append(f"{_rgb(color, 'RG')} 2 w 1 J 1 j " + " ".join(path) + " S 0 J 0 j")
+        for a, b in zip(xs, ys):
+            self.circle(a, b, 2.2, color)
+        step = max(1, int(math.ceil(n * 34 / pw)))
+        for i in range(0, n, step):
+            label = fit_text(labels[i], 34 * step, 7)
+            self.text(xs[i] - text_width(label, 7) / 2, y + 2, label, 7, color=GREY)
+        if highlight is not None and 0 <= highlight < n:
+            hx = xs[highlight]
+            self._ops.append(f"{_rgb(GOLD, 'RG')} 1.2 w [3 2] 0 d {hx:.2f} {py:.2f} m {hx:.2f} {py + ph:.2f} l S [] 0 d")
+            if highlight_label:
+                lx = min(hx + 4, px + pw - text_width(highlight_label, 7, True))
+                self.text(lx, py + ph - 8, highlight_label, 7, bold=True, color=GOLD)
+
+    def bar_chart(
+        self,
+        title: str,
+        labels: Sequence[str],
+        values: Sequence[float],
+        color: Color = BLUE,
+        value_format=_short,
+        bar_height: float = 14,
+    ) -> None:
+        """Horizontal bars, one row per label, with the value printed after each bar."""
+        if not values:
+            return
+        height = len(values) * (bar_height + 6)
+        x, y, w, h = self._chart_box(title, height)
+        label_w = min(max(text_width(str(l), 8) for l in labels) + 8, w * 0.35)
+        texts = [value_format(v) for v in values]
+        value_w = max(text_width(t, 8) for t in texts) + 6
+        top = max(max(values), 0) or 1
+        span = w - label_w - value_w
+        for i, (label, value, shown) in enumerate(zip(labels, values, texts)):
+            by = y + h - (i + 1) * (bar_height + 6) + 3
+            self.text(x, by + bar_height / 2 - 3, fit_text(label, label_w - 8, 8), 8)
+            bw = max(span * max(value, 0) / top, 1)
+            self.rect(x + label_w, by, bw, bar_height, _tint(color, 0.35 * i / max(len(values) - 1, 1)))
+            self.text(x + label_w + bw + 4, by + bar_height / 2 - 3, shown, 8, bold=True, color=GREY)
+
+    def donut_chart(
+        self,
+        title: str,
+        labels: Sequence[str],
+        values: Sequence[float],
+        size: float = 150,
+        hole: float = 0.6,
+        center: str = "",
+    ) -> None:
+        """Donut of ``values`` shares with a legend (label, percentage) to the right."""
+        total = float(sum(v for v in values if v > 0))
+        if not total:
+            return
+        x, y, w, h = self._chart_box(title, size)
+        r = size / 2
+        cx, cy = x + r, y + r
+        angle = math.pi / 2
+        for i, value in enumerate(values):
+            if value <= 0:
+                continue
+            sweep = 2 * math.pi * value / total
+            color = PALETTE[i % len(PALETTE)]
+            ops = _arc(cx, cy, r, angle, angle - sweep, True) + _arc(cx, cy, r * hole, angle - sweep, angle, False)
+            self._ops.append(f"{_rgb(color, 'rg')} " + " ".join(ops) + " h f")
+            angle -= sweep
+        if center:
+            self.text(cx - text_width(center, 11, True) / 2, cy - 4, center, 11, bold=True)
+        ly = y + size - 14
+        for i, (name, value) in enumerate(zip(labels, values)):
+            self.rect(x + size + 24, ly, 9, 9, PALETTE[i % len(PALETTE)])
+            self.text(x + size + 40, ly + 1, f"{name} — {value / total * 100:.0f}%", 9)
+            ly -= 16
+
+    # -- output ------------------------------------------------------------------
+
+    def _write_outline(self) -> Optional[int]:
+        if not self._outline:
+            return None
+        root = self._alloc()
+        items = [self._alloc() for _ in self._outline]
+        for i, (title, page_idx, y) in enumerate(self._outline):
+            page = self._pages[min(page_idx, len(self._pages) - 1)]
+            links = [f"/Parent {root} 0 R"]
+            if i:
+                links.append(f"/Prev {items[i - 1]} 0 R")
+            if i + 1 < len(items):
+                links.append(f"/Next {items[i + 1]} 0 R")
+            label = encode_text(title).translate(_ESCAPES)
+            self._write_obj(items[i], f"<< /Title ({label}) {' '.join(links)} /Dest [{page} 0 R /XYZ 0 {y:.0f} 0] >>")
+        self._write_obj(root, f"<< /Type /Outlines /First {items[0]} 0 R /Last {items[-1]} 0 R /Count {len(items)} >>")
+        return root
+
+    def finish(self) -> bytes:
+        """Close the document and return the PDF bytes (idempotent)."""
+        if self._result is not None:
+            return self._result
+        if self._ops is None and not self._pages:
+            self._new_page()
+        self._end_page()
+        kids = " ".join(f"{p} 0 R" for p in self._pages)
+        self._write_obj(self._pages_root, f"<< /Type /Pages /Count {len(self._pages)} /Kids [{kids}] >>")
+        outline = self._write_outline()
+        catalog = f"<< /Type /Catalog /Pages {self._pages_root} 0 R"
+        if outline:
+            catalog += f" /Outlines {outline} 0 R /PageMode /UseOutlines"
+        self._write_obj(self._catalog, catalog + " >>")
+        info = self._alloc()
+        stamp = self.created.strftime("D:%Y%m%d%H%M%S")
+        title = encode_text(self.title).translate(_ESCAPES)
+        author = encode_text(self.author).translate(_ESCAPES)
+        self._write_obj(info, f"<< /Title ({title}) /Author ({author}) /Producer (Lark Executive Suite) /CreationDate ({stamp}) >>")
+
+        xref_at = self._buf.tell()
+        size = self._next_obj
+        out = [f"xref\n0 {size}\n0000000000 65535 f \n"]
+        out.extend(f"{self._offsets[n]:010d} 00000 n \n" for n in range(1, size))
+        out.append(f"trailer\n<< /Size {size} /Root {self._catalog} 0 R /Info {info} 0 R >>\nstartxref\n{xref_at}\n%%EOF\n")
+        self._buf.write("".join(out).encode("ascii"))
+        self._result = self._buf.getvalue()
+        self._buf = None
+        return self._result
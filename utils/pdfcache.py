@@ -0,0 +1,104 @@
+"""On-demand PDF exports with a bounded on-disk cache.
+
+``lazy_pdf`` hands ``st.download_button`` a callable instead of bytes, so a document is
+only rendered when someone actually clicks download. The result is stored under
+``data/pdf_cache/`` keyed by a hash of the builder name, its inputs and the branding
+(cafe name and logo), so the same snapshot downloaded again — from any session or
+after a restart — is read back from disk. The directory is trimmed to ``MAX_BYTES``,
+least recently used files first.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from utils.figcache import fingerprint
+from utils.reports import LAYOUT_VERSION, branding
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = BASE_DIR / "data" / "pdf_cache"
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class PDFCache:
+    """Directory of ``<key>.pdf`` files bounded by total size, evicted by last access."""
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._prune()
+
+    def _prune(self) -> None:
+        entries = []
+        for path in self.root.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.root.glob("*.pdf"):
+            path.unlink(missing_ok=True)
+
+
+_CACHE = PDFCache()
+
+
+def render_pdf(name: str, builder: Callable[..., bytes], *args: Any, cache: Optional[PDFCache] = None) -> bytes:
+    """``builder(*args, brand=...)`` served from the disk cache when the same inputs were rendered before."""
+    cache = cache or _CACHE
+    brand = branding()
+    logo_hash = hashlib.sha1(brand["logo"]).hexdigest() if brand["logo"] else None
+    key = fingerprint(name, LAYOUT_VERSION, args, brand["name"], logo_hash)
+    data = cache.get(key)
+    if data is None:
+        data = builder(*args, brand=brand)
+        cache.put(key, data)
+    return data
+
+
+def lazy_pdf(name: str, builder: Callable[..., bytes], *args: Any) -> Callable[[], bytes]:
+    """Deferred ``render_pdf`` for ``st.download_button(data=...)``; nothing is built until clicked.
+
+    Callable ``data`` needs Streamlit 1.52 or newer (see requirements.txt).
+    """
+    return lambda: render_pdf(name, builder, *args)
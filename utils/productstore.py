@@ -0,0 +1,177 @@
+"""SQLite product store behind the Inventory Brain "Add Product" form.
+
+Products live in ``data/products.db`` keyed by an integer id with a unique index on
+name, so saving one product is a single-row upsert, whatever the catalog size.
+Images are written once to ``data/product_images/<sha256><ext>`` and the row keeps
+only that file name. The database runs in WAL mode with a busy timeout: concurrent
+sessions can write without corrupting it, and readers never block the writer.
+Each thread (Streamlit session) gets its own connection.
+
+Products saved by earlier versions to ``data/inventory.xlsx`` are imported on first use
+when the store is empty (needs an Excel reader such as openpyxl).
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DB_PATH = BASE_DIR / "data" / "products.db"
+IMAGE_DIR = BASE_DIR / "data" / "product_images"
+LEGACY_XLSX = BASE_DIR / "data" / "inventory.xlsx"
+BUSY_TIMEOUT = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    stock REAL NOT NULL DEFAULT 0,
+    min_stock REAL NOT NULL DEFAULT 0,
+    unit_cost REAL NOT NULL DEFAULT 0,
+    supplier TEXT,
+    image TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS products_name ON products (name);
+"""
+
+UPSERT = """
+INSERT INTO products (name, category, stock, min_stock, unit_cost, supplier, image, updated_at)
+VALUES (:name, :category, :stock, :min_stock, :unit_cost, :supplier, :image, :updated_at)
+ON CONFLICT (name) DO UPDATE SET
+    category = excluded.category,
+    stock = excluded.stock,
+    min_stock = excluded.min_stock,
+    unit_cost = excluded.unit_cost,
+    supplier = excluded.supplier,
+    image = COALESCE(excluded.image, products.image),
+    updated_at = excluded.updated_at
+RETURNING id
+"""
+
+
+class ProductStore:
+    """Indexed product table plus a content-addressed image folder."""
+
+    def __init__(self, path: Path = DB_PATH, image_dir: Path = IMAGE_DIR):
+        self.path = Path(path)
+        self.image_dir = Path(image_dir)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (WAL, NORMAL sync, busy timeout)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_image(self, data: bytes, filename: str = "") -> str:
+        """Store image bytes once under their SHA-256 and return the file name."""
+        ext = Path(filename).suffix.lower() or ".bin"
+        name = hashlib.sha256(data).hexdigest() + ext
+        target = self.image_dir / name
+        if not target.exists():
+            self.image_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.image_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        return name
+
+    def image_path(self, name: str) -> Path:
+        return self.image_dir / name
+
+    def upsert(
+        self,
+        name: str,
+        category: str = "",
+        stock: float = 0,
+        min_stock: float = 0,
+        unit_cost: float = 0,
+        supplier: str = "",
+        image: Optional[bytes] = None,
+        image_name: str = "",
+    ) -> int:
+        """Insert or update the product called ``name``; returns its id.
+
+        Without new ``image`` bytes an existing product keeps its current image.
+        """
+        row = {
+            "name": name.strip(),
+            "category": category,
+            "stock": float(stock),
+            "min_stock": float(min_stock),
+            "unit_cost": float(unit_cost),
+            "supplier": supplier.strip(),
+            "image": self.save_image(image, image_name) if image else None,
+            "updated_at": time.time(),
+        }
+        conn = self.connection()
+        with conn:
+            return conn.execute(UPSERT, row).fetchone()[0]
+
+    def get(self, name: str) -> Optional[dict]:
+        row = self.connection().execute("SELECT * FROM products WHERE name = ?", (name.strip(),)).fetchone()
+        return dict(row) if row else None
+
+    def count(self) -> int:
+        return self.connection().execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def frame(self) -> pd.DataFrame:
+        """Every product as a DataFrame, by name."""
+        return pd.read_sql_query("SELECT * FROM products ORDER BY name", self.connection())
+
+    def import_xlsx(self, path: Path = LEGACY_XLSX) -> int:
+        """Load rows from the old ``inventory.xlsx`` layout; returns how many (0 if unreadable)."""
+        try:
+            df = pd.read_excel(path)
+        except (ImportError, ValueError, OSError):
+            return 0
+        count = 0
+        for rec in df.to_dict("records"):
+            name = rec.get("Product Name")
+            if not isinstance(name, str) or not name.strip():
+                continue
+            image = rec.get("Image Bytes")
+            self.upsert(
+                name,
+                category=str(rec.get("Category") or ""),
+                stock=rec.get("Stock Quantity") or 0,
+                min_stock=rec.get("Minimum Stock") or 0,
+                unit_cost=rec.get("Unit Cost") or 0,
+                supplier=str(rec.get("Supplier") or ""),
+                image=image if isinstance(image, bytes) else None,
+                image_name=str(rec.get("Image Name") or ""),
+            )
+            count += 1
+        return count
+
+
+_STORE: Optional[ProductStore] = None
+_LOCK = threading.Lock()
+
+
+def product_store() -> ProductStore:
+    """Process-wide store; imports the legacy workbook the first time the store is empty."""
+    global _STORE
+    with _LOCK:
+        if _STORE is None:
+            _STORE = ProductStore()
+            if LEGACY_XLSX.exists() and _STORE.count() == 0:
+                _STORE.import_xlsx()
+        return _STORE
@@ -0,0 +1,91 @@
+"""Reorder optimizer: safety stock, reorder point and economic order quantity per SKU.
+
+All SKUs are solved at once with NumPy from daily demand mean/variance (the
+``utils.depletion`` forecast), supplier lead time and unit cost:
+
+- safety stock = z * sigma_daily * sqrt(lead time), z from ``SERVICE_Z``
+- reorder point = mean_daily * lead time + safety stock (never below the item's ``min``)
+- EOQ = sqrt(2 * annual demand * ``ORDER_COST`` / (``HOLDING_RATE`` * unit cost))
+
+An item is reordered once stock is at or below its reorder point; the order covers
+the EOQ (capped at ``shelf_life_days`` of demand for perishables), or the gap back up
+to the reorder point if that is larger, and is never less than one unit. Items without a
+``lead_time_days`` or ``unit_cost`` use ``DEFAULT_LEAD_DAYS`` and a ``REVIEW_DAYS``
+cover instead of EOQ.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from utils.depletion import hours_label
+
+
+SERVICE_Z = 1.645  # ~95% cycle service level
+DEMAND_CV = 0.25  # variability floor while the forecast has little history
+DEFAULT_LEAD_DAYS = 2.0
+ORDER_COST = 25.0  # AED per purchase order
+HOLDING_RATE = 0.25  # yearly holding cost as a share of unit cost
+REVIEW_DAYS = 7.0  # cover ordered when EOQ cannot be computed
+DAYS_PER_YEAR = 365.0
+
+
+def _column(items: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in items:
+        return np.full(len(items), default)
+    return items[name].fillna(default).to_numpy(dtype=float)
+
+
+def reorder_plan(items: pd.DataFrame, forecast: pd.DataFrame) -> pd.DataFrame:
+    """Safety stock, reorder point, EOQ and order quantity for every item.
+
+    ``items`` has ``name``, ``stock`` and optionally ``min``, ``lead_time_days``,
+    ``unit_cost`` and ``shelf_life_days``; ``forecast`` is the row-aligned ``depletion_forecast`` frame
+    (``tomorrow``, ``tomorrow_std``, ``hours``).
+    """
+    stock = items["stock"].to_numpy(dtype=float)
+    floor = _column(items, "min", 0.0)
+    lead = _column(items, "lead_time_days", DEFAULT_LEAD_DAYS)
+    cost = _column(items, "unit_cost", 0.0)
+    life = _column(items, "shelf_life_days", np.inf)
+    mean = forecast["tomorrow"].to_numpy(dtype=float)
+    sigma = np.maximum(forecast["tomorrow_std"].to_numpy(dtype=float), DEMAND_CV * mean)
+
+    safety = SERVICE_Z * sigma * np.sqrt(lead)
+    rop = np.maximum(mean * lead + safety, floor)
+    holding = HOLDING_RATE * cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eoq = np.where(holding > 0, np.sqrt(2 * mean * DAYS_PER_YEAR * ORDER_COST / holding), mean * REVIEW_DAYS)
+    due = (stock <= rop) & (rop > 0)
+    # Shelf life only caps where it is set (0 * inf would be NaN for items with no demand).
+    with np.errstate(invalid="ignore"):
+        cover = np.where(np.isfinite(life), np.minimum(eoq, mean * life), eoq)
+    qty = np.where(due, np.maximum(np.ceil(np.maximum(cover, rop - stock)), 1), 0)
+    return pd.DataFrame(
+        {
+            "name": items["name"].to_numpy(),
+            "stock": stock,
+            "safety_stock": safety,
+            "reorder_point": rop,
+            "eoq": eoq,
+            "order_qty": qty,
+            "hours": forecast["hours"].to_numpy(dtype=float),
+        }
+    )
+
+
+def reorder_rows(plan: pd.DataFrame, units=None) -> List[dict]:
+    """Supplier rows (``item``, ``amount``, ``reason``) for items due, soonest run-out first."""
+    units = units or {}
+    due = plan[plan["order_qty"] > 0].sort_values("hours", kind="stable")
+    rows = []
+    for r in due.itertuples(index=False):
+        runout = f"Projected to run out in {hours_label(r.hours)}" if np.isfinite(r.hours) else "At or below minimum stock"
+        rows.append(
+            {
+                "item": r.name,
+                "amount": f"{r.order_qty:,.0f} {units.get(r.name, 'units')}",
+                "reason": f"{runout}; reorder point {r.reorder_point:,.0f}, safety stock {r.safety_stock:,.0f}.",
+            }
+        )
+    return rows
@@ -0,0 +1,182 @@
+"""PDF exports built on ``utils.pdf``: executive snapshot, report sections, supplier list.
+
+Each builder takes plain data (the same dicts the pages render) plus the cafe
+branding from Settings and returns PDF bytes, so pages and offline tools share one
+layout.
+"""
+import json
+from datetime import date as Date
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional, Sequence
+
+from utils.pdf import GOLD, PDFDocument
+from utils.timebucket import parse_hour_labels
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SETTINGS_PATH = BASE_DIR / "data" / "settings.json"
+LAYOUT_VERSION = 2  # bump when document layout changes so cached PDFs are rebuilt
+UNIT_SECTIONS = ("waste_report", "category_performance")  # values are units / percent, not AED
+
+
+def branding(path: Path = SETTINGS_PATH) -> dict:
+    """Cafe name and logo bytes (or None) as configured on the Settings page."""
+    try:
+        settings = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        settings = {}
+    logo = settings.get("logo")
+    return {
+        "name": settings.get("name") or "Larc Cafe",
+        "logo": logo.encode("latin-1") if logo else None,
+    }
+
+
+def new_document(title: str, subtitle: str = "", brand: Optional[Mapping] = None) -> PDFDocument:
+    brand = brand or {}
+    return PDFDocument(title, subtitle, brand=brand.get("name", ""), logo=brand.get("logo"))
+
+
+def _aed(value) -> str:
+    return f"AED {value:,.2f}" if isinstance(value, (int, float)) and not isinstance(value, bool) else str(value)
+
+
+def section_title(key: str) -> str:
+    """"profit_summary" -> "Profit Summary"."""
+    return key.replace("_", " ").title()
+
+
+def add_records(doc: PDFDocument, rows: Sequence[Mapping], money: bool = True) -> None:
+    """Table of record dicts; columns are the union of keys in first-seen order."""
+    columns: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    if not columns:
+        doc.paragraph("No data available.", color=(0.45, 0.45, 0.45))
+        return
+    body = [[_aed(row.get(c)) if money else row.get(c) for c in columns] for row in rows]
+    align = ["r" if any(isinstance(r.get(c), (int, float)) for r in rows) else "l" for c in columns]
+    doc.table([section_title(c) for c in columns], body, align=align)
+
+
+def _label_key(rows: Sequence[Mapping]) -> Optional[str]:
+    for key, value in rows[0].items():
+        if isinstance(value, str):
+            return key
+    return None
+
+
+def add_section_chart(doc: PDFDocument, section: str, rows: Sequence[Mapping]) -> None:
+    """Chart for a reports.json section: donut for category shares, bars otherwise."""
+    if not rows or "value" not in rows[0]:
+        return
+    key = _label_key(rows)
+    if key is None:
+        return
+    labels = [str(r.get(key, "")) for r in rows]
+    values = [float(r.get("value") or 0) for r in rows]
+    if section == "category_performance":
+        doc.donut_chart("Category Contribution", labels, values, center="Share")
+    elif section == "waste_report":
+        doc.bar_chart("Waste by Item (units)", labels, values)
+    else:
+        doc.bar_chart(section_title(section), labels, values, value_format=lambda v: f"AED {v:,.0f}")
+
+
+def add_sales_charts(doc: PDFDocument, sales: Mapping, predicted_peak: Optional[str] = None) -> None:
+    """Hourly sales line, category mix donut and top items bars, as on the dashboard."""
+    hourly = list(sales.get("sales_by_hour") or [])
+    if hourly:
+        labels = [h["hour"] for h in hourly]
+        highlight = None
+        if predicted_peak:
+            hours = list(parse_hour_labels(labels))
+            peak = int(parse_hour_labels([predicted_peak])[0])
+            highlight = hours.index(peak) if peak in hours else None
+        doc.line_chart(
+            "Sales per Hour (AED)",
+            labels,
+            [float(h["sales"]) for h in hourly],
+            highlight=highlight,
+            highlight_label="Expected peak",
+        )
+    mix = sales.get("category_breakdown") or {}
+    if mix:
+        doc.donut_chart("Category Mix", list(mix), [float(v) for v in mix.values()], center="Mix")
+    top = list(sales.get("top_items") or [])
+    if top:
+        doc.bar_chart(
+            "Top Items by Revenue",
+            [t["name"] for t in top],
+            [float(t["revenue"]) for t in top],
+            value_format=lambda v: f"AED {v:,.0f}",
+        )
+
+
+def snapshot_pdf(
+    sales: Mapping,
+    alerts: Iterable[str],
+    low_stock: Iterable[Mapping],
+    predicted_peak: Optional[str],
+    brand: Optional[Mapping] = None,
+) -> bytes:
+    """One-page executive snapshot: KPIs, then alerts, low stock and the predicted peak."""
+    doc = new_document("Lark Executive Snapshot", "Generated by Quantex", brand)
+    doc.section("Key Figures")
+    doc.table(
+        ["Metric", "Value"],
+        [
+            ["Today Revenue", f"AED {sales['today_sales']:,.0f}"],
+            ["Orders Today", f"{sales['orders_today']:,}"],
+            ["Avg Ticket", f"AED {sales['avg_ticket']:,.2f}"],
+            ["Profit Margin", f"{sales['profit_margin'] * 100:.1f}%"],
+        ],
+        widths=[2, 1],
+        align=["l", "r"],
+    )
+    doc.section("Executive Insights")
+    doc.bullets(
+        [
+            *alerts,
+            *[f"Low stock: {i['name']} ({i['stock']})" for i in low_stock],
+            f"Predicted peak: {predicted_peak or 'N/A'}",
+        ]
+    )
+    doc.section("Sales Charts")
+    add_sales_charts(doc, sales, predicted_peak)
+    return doc.finish()
+
+
+def report_pdf(
+    section: str,
+    rows: Sequence[Mapping],
+    trend: Sequence[Mapping] = (),
+    brand: Optional[Mapping] = None,
+) -> bytes:
+    """A report section (e.g. ``reports.json["profit_summary"]``) as a table and chart.
+
+    ``trend`` is an optional day/value series (the inventory waste chart) drawn as a line.
+    """
+    doc = new_document("Lark Executive Report", f"Section: {section}", brand)
+    doc.section(section_title(section))
+    add_records(doc, rows, money=section not in UNIT_SECTIONS)
+    add_section_chart(doc, section, rows)
+    if trend:
+        doc.line_chart("Waste Trend (units)", [t["day"] for t in trend], [float(t["value"]) for t in trend], color=GOLD)
+    return doc.finish()
+
+
+def supplier_pdf(rows: Sequence[Mapping], day: Optional[Date] = None, brand: Optional[Mapping] = None) -> bytes:
+    """Supplier reorder list with item, quantity and reason columns."""
+    day = day or Date.today()
+    doc = new_document("Supplier Reorder List", f"Date: {day.strftime('%d %b %Y')}", brand)
+    doc.section("Reorder Lines")
+    doc.table(
+        ["Item", "Order", "Reason"],
+        [[row["item"], row["amount"], row["reason"]] for row in rows],
+        widths=[2, 1, 4],
+        align=["l", "r", "l"],
+    )
+    return doc.finish()
@@ -0,0 +1,270 @@
+"""Incremental sales rollups fed by the order journal.
+
+``SalesRollup`` folds each journaled order into hourly, daily and weekly buckets in
+constant time per order line and remembers the journal offset it has consumed
+(the watermark). State is persisted to ``data/rollups.json`` so a restart only
+replays the journal tail written since the last save.
+
+``live_sales`` returns today's numbers in exactly the shape of ``sales.json``
+(``today_sales``, ``orders_today``, ``avg_ticket``, ``profit_margin``,
+``sales_by_hour``, ``category_breakdown``, ``top_items``), falling back to the demo
+file when no order has been taken today. Top sellers per day and per ISO week are
+tracked with bounded Space-Saving summaries (``utils.topk``), exact while the
+catalog fits in ``TOP_CAPACITY`` and reported with an error bound otherwise.
+"""
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import pandas as pd
+
+from utils.journal import JOURNAL_PATH, journal_size, replay
+from utils.loader import load_frame, load_json, records_frame
+from utils.timebucket import hour_label
+from utils.topk import SpaceSaving
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATE_PATH = BASE_DIR / "data" / "rollups.json"
+
+HOURLY_RETENTION_DAYS = 14
+DAILY_RETENTION_DAYS = 400
+TOP_ITEMS = 3
+TOP_CAPACITY = 64
+WEEKLY_RETENTION_WEEKS = 8
+
+
+def week_key(day: date) -> str:
+    iso = day.isocalendar()
+    return f"{iso[0]}-W{iso[1]:02d}"
+
+
+def _new_day() -> dict:
+    return {"sales": 0.0, "orders": 0, "costed_sales": 0.0, "cost": 0.0, "hours": {}, "categories": {}}
+
+
+def _new_top() -> dict:
+    return {"qty": SpaceSaving(TOP_CAPACITY), "revenue": SpaceSaving(TOP_CAPACITY)}
+
+
+class SalesRollup:
+    """Hourly/daily/weekly aggregates maintained one order at a time."""
+
+    def __init__(self, costs: Optional[Mapping[str, float]] = None):
+        self.costs = dict(costs or {})
+        self.watermark = 0
+        self.hourly: dict = {}  # epoch hour -> [sales, orders]
+        self.daily: dict = {}  # ISO date -> day bucket
+        self.weekly: dict = {}  # ISO year-week -> [sales, orders]
+        self.top: dict = {"day": {}, "week": {}}  # window -> key -> {"qty", "revenue"} summaries
+        self._last_day = None
+
+    def apply(self, record: Mapping) -> None:
+        ts = float(record["ts"])
+        local = time.localtime(ts)
+        day_key = time.strftime("%Y-%m-%d", local)
+        wk = week_key(date(local.tm_year, local.tm_mon, local.tm_mday))
+        hour_key = int(ts // 3600)
+
+        lines = record.get("lines", [])
+        total = sum(line["qty"] * line["price"] for line in lines)
+
+        hour = self.hourly.setdefault(hour_key, [0.0, 0])
+        hour[0] += total
+        hour[1] += 1
+        week = self.weekly.setdefault(wk, [0.0, 0])
+        week[0] += total
+        week[1] += 1
+
+        day = self.daily.get(day_key)
+        if day is None:
+            day = self.daily[day_key] = _new_day()
+        day["sales"] += total
+        day["orders"] += 1
+        hod = str(local.tm_hour)
+        day["hours"][hod] = day["hours"].get(hod, 0.0) + total
+        top_day = self._top("day", day_key)
+        top_week = self._top("week", wk)
+        for line in lines:
+            revenue = line["qty"] * line["price"]
+            category = line.get("category") or "Other"
+            day["categories"][category] = day["categories"].get(category, 0.0) + revenue
+            for top in (top_day, top_week):
+                top["qty"].add(line["item"], line["qty"])
+                top["revenue"].add(line["item"], revenue)
+            cost = self.costs.get(line["item"])
+            if cost is not None:
+                day["costed_sales"] += revenue
+                day["cost"] += line["qty"] * cost
+
+        if day_key != self._last_day:
+            self._last_day = day_key
+            self._prune(ts)
+
+    def _top(self, window: str, key: str) -> dict:
+        top = self.top[window].get(key)
+        if top is None:
+            top = self.top[window][key] = _new_top()
+        return top
+
+    def _prune(self, now: float) -> None:
+        hour_floor = int(now // 3600) - HOURLY_RETENTION_DAYS * 24
+        for key in [k for k in self.hourly if k < hour_floor]:
+            del self.hourly[key]
+        day_floor = (date.fromtimestamp(now) - timedelta(days=DAILY_RETENTION_DAYS)).isoformat()
+        for key in [k for k in self.daily if k < day_floor]:
+            del self.daily[key]
+            self.top["day"].pop(key, None)
+        week_floor = week_key(date.fromtimestamp(now) - timedelta(weeks=WEEKLY_RETENTION_WEEKS))
+        for key in [k for k in self.top["week"] if k < week_floor]:
+            del self.top["week"][key]
+
+    def refresh(self, path: Path = JOURNAL_PATH) -> int:
+        """Apply records appended since the watermark; returns how many were applied."""
+        if self.watermark > journal_size(path):
+            # Journal was truncated or replaced: rebuild from scratch.
+            self.__init__(self.costs)
+        applied = 0
+        for offset, record in replay(path, self.watermark):
+            self.apply(record)
+            self.watermark = offset
+            applied += 1
+        return applied
+
+    def day_summary(self, day: Optional[str] = None) -> Optional[dict]:
+        """Aggregates for ``day`` (default today) in the sales.json shape, or None if empty."""
+        day = day or date.today().isoformat()
+        bucket = self.daily.get(day)
+        if not bucket or not bucket["orders"]:
+            return None
+        sales = bucket["sales"]
+        hours = sorted((int(h), v) for h, v in bucket["hours"].items())
+        top = self.top["day"].get(day) or _new_top()
+        summary = {
+            "source": "live",
+            "today_sales": round(sales, 2),
+            "orders_today": bucket["orders"],
+            "avg_ticket": round(sales / bucket["orders"], 2),
+            "sales_by_hour": [{"hour": hour_label(h), "sales": round(v, 2)} for h, v in hours],
+            "category_breakdown": {
+                cat: round(v / sales * 100, 1) if sales else 0 for cat, v in bucket["categories"].items()
+            },
+            "top_items": [
+                {"name": e.key, "qty": int(top["qty"].get(e.key)), "revenue": round(e.count, 2)}
+                for e in top["revenue"].top(TOP_ITEMS)
+            ],
+            "top_items_exact": top["revenue"].exact,
+            "top_items_max_error": round(top["revenue"].max_error, 2),
+        }
+        if bucket["costed_sales"]:
+            summary["profit_margin"] = round(1 - bucket["cost"] / bucket["costed_sales"], 4)
+        return summary
+
+    def top_sellers(self, n: int = TOP_ITEMS, window: str = "day", by: str = "qty", key: Optional[str] = None) -> list:
+        """Heaviest items for a ``window`` ("day" or "week"; default the current one) ranked ``by`` qty or revenue.
+
+        Each row carries ``error``: how much its value may be overestimated (0 when exact).
+        """
+        if key is None:
+            key = date.today().isoformat() if window == "day" else week_key(date.today())
+        top = self.top[window].get(key)
+        if top is None:
+            return []
+        return [{"name": e.key, by: e.count, "error": e.error} for e in top[by].top(n)]
+
+    def daily_series(self, days: int = 7, end: Optional[date] = None) -> list:
+        """Sales per day for the last ``days`` days (zero-filled), oldest first."""
+        end = end or date.today()
+        out = []
+        for back in range(days - 1, -1, -1):
+            day = end - timedelta(days=back)
+            bucket = self.daily.get(day.isoformat())
+            out.append({"day": day.strftime("%a"), "date": day.isoformat(), "sales": round(bucket["sales"], 2) if bucket else 0.0})
+        return out
+
+    def to_state(self) -> dict:
+        return {
+            "watermark": self.watermark,
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "weekly": self.weekly,
+            "top": {
+                window: {key: {by: s.to_state() for by, s in top.items()} for key, top in tops.items()}
+                for window, tops in self.top.items()
+            },
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping, costs: Optional[Mapping[str, float]] = None) -> "SalesRollup":
+        rollup = cls(costs)
+        rollup.watermark = int(state.get("watermark", 0))
+        rollup.hourly = {int(k): v for k, v in state.get("hourly", {}).items()}
+        rollup.daily = dict(state.get("daily", {}))
+        rollup.weekly = dict(state.get("weekly", {}))
+        for window, tops in state.get("top", {}).items():
+            rollup.top[window] = {
+                key: {by: SpaceSaving.from_state(s) for by, s in top.items()} for key, top in tops.items()
+            }
+        rollup._last_day = max(rollup.daily) if rollup.daily else None
+        return rollup
+
+    def save(self, path: Path = STATE_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(json.dumps(self.to_state(), separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+def load_rollup(path: Path = STATE_PATH, costs: Optional[Mapping[str, float]] = None) -> SalesRollup:
+    """Restore persisted rollups (or start empty when there is no usable state file)."""
+    try:
+        return SalesRollup.from_state(json.loads(path.read_text(encoding="utf-8")), costs)
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return SalesRollup(costs)
+
+
+_ROLLUP: Optional[SalesRollup] = None
+_LOCK = threading.Lock()
+
+
+def get_rollup() -> SalesRollup:
+    """Process-wide rollup, caught up with the journal tail on every call."""
+    global _ROLLUP
+    with _LOCK:
+        if _ROLLUP is None:
+            costs = {p["name"]: p["cost"] for p in load_json("products.json") if "cost" in p}
+            _ROLLUP = load_rollup(costs=costs)
+        if _ROLLUP.refresh():
+            _ROLLUP.save()
+        return _ROLLUP
+
+
+def live_sales(static: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Today's live rollup merged over the static sales data, or ``static`` if no orders today."""
+    rollup = get_rollup()
+    with _LOCK:
+        summary = rollup.day_summary()
+    if summary is None:
+        return static
+    return {**static, **summary}
+
+
+def top_sellers(n: int = TOP_ITEMS, window: str = "day", by: str = "qty") -> list:
+    """Current top sellers from the shared rollup (empty when the window has no orders)."""
+    rollup = get_rollup()
+    with _LOCK:
+        return rollup.top_sellers(n, window, by)
+
+
+def sales_frame(sales: Mapping[str, Any], table: str, default: Optional[list] = None) -> pd.DataFrame:
+    """DataFrame for one sales table: live rollup rows when present, else the demo data."""
+    if sales.get("source") == "live":
+        return records_frame(sales.get(table, default or []))
+    return load_frame("sales.json", table, default=default)
@@ -2,6 +2,8 @@ from pathlib import Path
 
 import streamlit as st
 
+from utils.theme import accent_vars
+
 NAV_ITEMS = [
     ("Executive Dashboard", "pages/2_Executive_Dashboard.py"),
     ("Qx Intelligence", "pages/3_IntaAgent_AI.py"),
@@ -15,6 +17,21 @@ NAV_ITEMS = [
 ]
 
 
+@st.fragment
+def accent_picker():
+    """Accent radio; a change reruns only this fragment and restyles the page through CSS variables."""
+    st.session_state.setdefault("accent_color", "Blue")
+    accent = st.radio(
+        "Pick accent",
+        ["Blue", "Gold"],
+        index=0 if st.session_state["accent_color"] == "Blue" else 1,
+        horizontal=True,
+        label_visibility="collapsed",
+    )
+    st.session_state["accent_color"] = accent
+    st.markdown(f"<style>:root {{ {accent_vars(accent)} }}</style>", unsafe_allow_html=True)
+
+
 def render_sidebar():
     """Render branded sidebar with navigation buttons."""
     logo_path = Path(__file__).resolve().parent.parent / "assets" / "lark_logo.png"
@@ -30,16 +47,9 @@ def render_sidebar():
             st.sidebar.markdown("<div style='color:#9fb0c7;'>Larc Cafe</div>", unsafe_allow_html=True)
     st.sidebar.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
-    st.session_state.setdefault("accent_color", "Blue")
     st.sidebar.markdown("**Accent Color**")
-    accent = st.sidebar.radio(
-        "Pick accent",
-        ["Blue", "Gold"],
-        index=0 if st.session_state["accent_color"] == "Blue" else 1,
-        horizontal=True,
-        label_visibility="collapsed",
-    )
-    st.session_state["accent_color"] = accent
+    with st.sidebar:
+        accent_picker()
     st.sidebar.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
     active = st.session_state.get("active_page")
@@ -0,0 +1,173 @@
+"""Columnar snapshots of the demo_data JSON sources.
+
+Each source compiles to ``demo_data/_snapshots/<stem>/`` holding one ``.npy`` file per
+column plus a ``manifest.json`` recording the source mtime/size it was built from.
+Columns are memory-mapped on read, so numeric columns reach pandas without a copy.
+
+Build (or rebuild) with::
+
+    python -m utils.snapshot            # every demo_data/*.json
+    python -m utils.snapshot sales.json
+"""
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SNAPSHOT_DIR = BASE_DIR / "demo_data" / "_snapshots"
+MANIFEST = "manifest.json"
+ROOT_TABLE = "rows"
+
+# filename -> (manifest mtime_ns, manifest dict); reused across reruns
+_MANIFESTS: dict = {}
+_LOCK = threading.Lock()
+
+
+def _column(values: list) -> Optional[np.ndarray]:
+    """Build a typed column, or None when the values are not a clean scalar column."""
+    present = [v for v in values if v is not None]
+    if not present or any(isinstance(v, (dict, list, tuple)) for v in present):
+        return None
+    if all(isinstance(v, str) for v in present):
+        return np.array(values, dtype=str) if len(present) == len(values) else None
+    if all(isinstance(v, bool) for v in present):
+        return np.array(values, dtype=bool) if len(present) == len(values) else None
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        if len(present) == len(values) and all(isinstance(v, int) for v in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    return None
+
+
+def _records_table(records) -> Optional[Dict[str, np.ndarray]]:
+    if not records or not all(isinstance(r, dict) for r in records):
+        return None
+    names = list(dict.fromkeys(k for r in records for k in r))
+    table = {}
+    for name in names:
+        col = _column([r.get(name) for r in records])
+        if col is None:
+            return None
+        table[name] = col
+    return table
+
+
+def _mapping_table(mapping: dict) -> Optional[Dict[str, np.ndarray]]:
+    values = _column(list(mapping.values()))
+    if values is None:
+        return None
+    return {"key": np.array(list(mapping.keys()), dtype=str), "value": values}
+
+
+def extract_tables(data: Any) -> Dict[str, Dict[str, np.ndarray]]:
+    """Pull every tabular part out of a parsed JSON document.
+
+    A top-level list of records becomes the ``rows`` table; under a top-level object,
+    lists of records keep their key as table name and flat scalar mappings (e.g.
+    ``category_breakdown``) become two-column ``key``/``value`` tables.
+    """
+    if isinstance(data, (list, tuple)):
+        table = _records_table(data)
+        return {ROOT_TABLE: table} if table else {}
+    tables = {}
+    if isinstance(data, dict):
+        for name, value in data.items():
+            if isinstance(value, (list, tuple)):
+                table = _records_table(value)
+            elif isinstance(value, dict):
+                table = _mapping_table(value)
+            else:
+                table = None
+            if table:
+                tables[name] = table
+    return tables
+
+
+def build_snapshot(source: Path, data: Any, root: Path = SNAPSHOT_DIR) -> Path:
+    """Compile ``data`` (parsed from ``source``) into a snapshot directory and return it."""
+    st = os.stat(source)
+    target = root / source.stem
+    staging = root / f".{source.stem}.building"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    manifest = {"source_mtime_ns": st.st_mtime_ns, "source_size": st.st_size, "tables": {}}
+    for name, table in extract_tables(data).items():
+        table_dir = staging / name
+        table_dir.mkdir()
+        for idx, col in enumerate(table.values()):
+            np.save(table_dir / f"{idx}.npy", col, allow_pickle=False)
+        manifest["tables"][name] = {"columns": list(table.keys()), "rows": len(next(iter(table.values())))}
+    (staging / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+    return target
+
+
+def _manifest(source: Path, root: Path) -> Optional[dict]:
+    path = root / source.stem / MANIFEST
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = (root, source.stem)
+    cached = _MANIFESTS.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    with _LOCK:
+        _MANIFESTS[key] = (mtime, manifest)
+    return manifest
+
+
+def read_table(source: Path, table: str, root: Path = SNAPSHOT_DIR) -> Optional[pd.DataFrame]:
+    """Return ``table`` from the snapshot of ``source`` as a DataFrame over memory-mapped columns.
+
+    Returns None when there is no snapshot, it is stale (source mtime/size changed) or
+    it does not contain the table, so callers can fall back to the JSON source.
+    """
+    manifest = _manifest(source, root)
+    if manifest is None:
+        return None
+    try:
+        st = os.stat(source)
+    except FileNotFoundError:
+        return None
+    if (st.st_mtime_ns, st.st_size) != (manifest["source_mtime_ns"], manifest["source_size"]):
+        return None
+    meta = manifest["tables"].get(table)
+    if meta is None:
+        return None
+    table_dir = root / source.stem / table
+    try:
+        columns = {
+            name: np.load(table_dir / f"{idx}.npy", mmap_mode="r", allow_pickle=False)
+            for idx, name in enumerate(meta["columns"])
+        }
+    except (FileNotFoundError, ValueError):
+        return None
+    return pd.DataFrame(columns, copy=False)
+
+
+def main(argv=None) -> int:
+    from utils.loader import data_path, load_json
+
+    names = (argv if argv is not None else sys.argv[1:]) or sorted(
+        p.name for p in (BASE_DIR / "demo_data").glob("*.json")
+    )
+    for name in names:
+        target = build_snapshot(data_path(name), load_json(name))
+        tables = json.loads((target / MANIFEST).read_text(encoding="utf-8"))["tables"]
+        print(f"{name}: {len(tables)} table(s) -> {target.relative_to(BASE_DIR)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Inline SVG sparklines for KPI and driver cards.
+
+``sparkline`` turns a short series into a self-contained ``<svg>`` string that can be
+dropped straight into the card HTML passed to ``st.markdown(..., unsafe_allow_html=True)``.
+No Plotly figure, iframe or JS payload is involved; a card costs a few hundred bytes.
+The stroke follows the ``--lark-spark`` CSS variable, so an accent change restyles
+sparklines already on the page without re-rendering them.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from utils.theme import accent_palette
+
+
+MIN_COLOR = "#ff8c8c"
+MAX_COLOR = "#c3f3de"
+
+
+def accent_color(accent: Optional[str] = None) -> str:
+    """Sparkline stroke colour for ``accent`` (default: the session's accent picker)."""
+    return accent_palette(accent)["spark"]
+
+
+def _points(values: np.ndarray, width: float, height: float, pad: float) -> np.ndarray:
+    n = values.size
+    x = np.linspace(pad, width - pad, n) if n > 1 else np.array([width / 2])
+    lo, hi = values.min(), values.max()
+    span = hi - lo
+    if span:
+        y = pad + (hi - values) / span * (height - 2 * pad)
+    else:
+        y = np.full(n, height / 2)
+    return np.column_stack([x, y])
+
+
+def sparkline(
+    values: Sequence[float],
+    width: int = 160,
+    height: int = 40,
+    color: Optional[str] = None,
+    accent: Optional[str] = None,
+    stroke: float = 2,
+    markers: bool = True,
+    fill: bool = True,
+) -> str:
+    """Render ``values`` as an inline SVG line with optional area fill and min/max markers.
+
+    ``color`` pins the stroke colour; by default it tracks the accent. Returns ``""`` for an
+    empty series.
+    """
+    arr = np.asarray(values, dtype=float)
+    arr = arr[np.isfinite(arr)]
+    if arr.size == 0:
+        return ""
+    paint = color or f"var(--lark-spark, {accent_color(accent)})"
+    pad = stroke + 3
+    pts = _points(arr, width, height, pad)
+    coords = " ".join(f"{x:.1f},{y:.1f}" for x, y in pts)
+
+    parts = [
+        f'<svg class="sparkline" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" height="{height}" role="img" '
+        f'aria-label="trend from {arr[0]:,.2f} to {arr[-1]:,.2f}, min {arr.min():,.2f}, max {arr.max():,.2f}">'
+    ]
+    if fill and arr.size > 1:
+        base = height - pad
+        area = f"{pts[0, 0]:.1f},{base:.1f} {coords} {pts[-1, 0]:.1f},{base:.1f}"
+        parts.append(f'<polygon points="{area}" style="fill:{paint}" fill-opacity="0.12" stroke="none"/>')
+    parts.append(
+        f'<polyline points="{coords}" fill="none" style="stroke:{paint}" stroke-width="{stroke}" '
+        'stroke-linecap="round" stroke-linejoin="round"/>'
+    )
+    if markers and arr.size > 1 and arr.max() > arr.min():
+        r = stroke + 1
+        for idx, marker in ((int(arr.argmin()), MIN_COLOR), (int(arr.argmax()), MAX_COLOR)):
+            x, y = pts[idx]
+            parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r}" fill="{marker}"/>')
+    parts.append("</svg>")
+    return "".join(parts)
@@ -0,0 +1,46 @@
+"""Vectorized stock status for inventory items.
+
+``classify`` labels every item in one ``np.select`` over stock/min ratios: below
+minimum is "Critical", exactly at minimum "Low", above it "OK". Items with no minimum
+count as ratio 1 ("Low") on the cards, but ``low_stock`` lists them only when they are
+out of stock. It also adds the card fill percentage and colours, so pages
+compute status once and reuse it for the card grid, risk lists and dashboard.
+"""
+import numpy as np
+import pandas as pd
+
+
+STATUSES = ("Critical", "Low", "OK")
+BADGE_BG = {"Critical": "rgba(255,77,77,0.35)", "Low": "rgba(224,180,85,0.35)", "OK": "rgba(78,204,163,0.35)"}
+BADGE_FG = {"Critical": "#ff8c8c", "Low": "#ffd78a", "OK": "#c3f3de"}
+BAR_COLOR = {"Critical": "#FF6B6B", "Low": "#E0B455", "OK": "#1B76FF"}
+MAX_PCT = 150
+
+
+def classify(items: pd.DataFrame) -> pd.DataFrame:
+    """``items`` plus ``status``, ``pct`` (stock as % of min, 0-150), ``bg``, ``fg`` and ``bar``."""
+    stock = items["stock"].to_numpy(dtype=float)
+    minimum = items["min"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(minimum != 0, stock / minimum, 1.0)
+    status = np.select([ratio < 1, ratio == 1], ["Critical", "Low"], "OK")
+    pct = np.clip(np.trunc(ratio * 100), 0, MAX_PCT).astype(int)
+    labels = pd.Series(status, index=items.index)
+    return items.assign(
+        status=labels,
+        pct=pct,
+        bg=labels.map(BADGE_BG),
+        fg=labels.map(BADGE_FG),
+        bar=labels.map(BAR_COLOR),
+    )
+
+
+def low_stock(items: pd.DataFrame) -> list:
+    """``name``/``stock`` records of items that are Critical or Low.
+
+    Items with no minimum only count once they are out of stock; their "Low" badge is
+    not a shortage.
+    """
+    classified = classify(items)
+    unset = (classified["min"] == 0) & (classified["stock"] > 0)
+    return classified.loc[(classified["status"] != "OK") & ~unset, ["name", "stock"]].to_dict("records")
@@ -1,15 +1,25 @@
 import streamlit as st
 
 
+ACCENTS = {
+    "Blue": {"primary": "#1B76FF", "gold": "#E0B455", "spark": "#5FB1FF"},
+    "Gold": {"primary": "#E0B455", "gold": "#E0B455", "spark": "#E0B455"},
+}
+
+
+def accent_palette(accent=None):
+    """Colours for an accent choice (default: the session's accent picker)."""
+    return ACCENTS.get(accent or st.session_state.get("accent_color", "Blue"), ACCENTS["Blue"])
+
+
+def accent_vars(accent=None):
+    """CSS custom properties carrying the accent colours."""
+    palette = accent_palette(accent)
+    return f"--lark-blue: {palette['primary']}; --lark-gold: {palette['gold']}; --lark-spark: {palette['spark']};"
+
+
 def apply_theme():
     """Apply global dark, glassmorphic theme for Lark Executive Suite."""
-    accent_choice = st.session_state.get("accent_color", "Blue")
-    if accent_choice == "Gold":
-        primary = "#E0B455"
-        accent_gold = "#E0B455"
-    else:
-        primary = "#1B76FF"
-        accent_gold = "#E0B455"
     st.set_page_config(
         page_title="Lark Executive Suite",
         page_icon="💠",
@@ -22,8 +32,7 @@ def apply_theme():
         <style>
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
         :root {{
-            --lark-blue: {primary};
-            --lark-gold: {accent_gold};
+            {accent_vars()}
             --card: rgba(255, 255, 255, 0.05);
             --card-strong: rgba(255, 255, 255, 0.08);
             --stroke: rgba(255, 255, 255, 0.12);
@@ -0,0 +1,162 @@
+"""Vectorized time bucketing over int64 epoch-second arrays.
+
+Everything here works on whole NumPy arrays in one pass: ``buckets`` derives
+hour-of-day, day-of-week (Monday = 0) and day-of-year for millions of timestamps,
+``hour_histogram``/``peak`` find the busiest hour, and ``parse_hour_labels`` turns
+"8 AM", "8AM" or "20:00" style labels into hour numbers without per-row Python.
+Local time follows the server timezone per timestamp (DST included) unless a fixed
+``utc_offset`` is passed; the streaming models pass one so their local hours stay
+contiguous.
+
+``TimestampStore`` keeps the journaled order timestamps as a growable int64 array,
+caught up incrementally from the journal watermark.
+"""
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.journal import JOURNAL_PATH, journal_size, replay
+
+
+HOURS = 24
+DAYS = 7
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+HOUR_LABEL = r"^\s*(\d{1,2})(?::\d{2})?\s*([AaPp][Mm])?"
+
+
+def local_offset(at: Optional[float] = None) -> int:
+    """Seconds east of UTC for the server's local timezone (at ``at``, default now)."""
+    return time.localtime(at).tm_gmtoff
+
+
+def local_offsets(ts) -> np.ndarray:
+    """Seconds east of UTC at each timestamp (looked up once per distinct hour)."""
+    ts = to_epoch(ts)
+    hours, inverse = np.unique(ts // SECONDS_PER_HOUR, return_inverse=True)
+    offsets = np.array([local_offset(int(h) * SECONDS_PER_HOUR) for h in hours], dtype=np.int64)
+    return offsets[inverse.reshape(ts.shape)]
+
+
+def to_epoch(values) -> np.ndarray:
+    """Coerce epoch seconds (int/float) or datetime64 values to an int64 epoch-second array."""
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        return arr.astype("datetime64[s]").astype(np.int64)
+    return arr.astype(np.int64, copy=False)
+
+
+def buckets(ts, utc_offset: Optional[int] = None) -> dict:
+    """Hour-of-day, day-of-week (Mon=0), day-of-year (1-based) and epoch day for every timestamp.
+
+    Without ``utc_offset`` each timestamp uses the local offset in force at that moment,
+    so bucketing stays right across DST changes; with one, that fixed offset is applied.
+    """
+    ts = to_epoch(ts)
+    local = ts + (local_offsets(ts) if utc_offset is None else utc_offset)
+    day = local // SECONDS_PER_DAY
+    dates = day.astype("datetime64[D]")
+    year_start = dates.astype("datetime64[Y]").astype("datetime64[D]")
+    return {
+        "hour": (local // SECONDS_PER_HOUR) % HOURS,
+        "dow": (day + 3) % DAYS,  # 1970-01-01 was a Thursday
+        "doy": (dates - year_start).astype(np.int64) + 1,
+        "day": day,
+    }
+
+
+def hour_histogram(ts, weights=None, utc_offset: Optional[int] = None) -> np.ndarray:
+    """Order count (or summed ``weights``) per hour of day, length 24."""
+    hours = buckets(ts, utc_offset)["hour"]
+    return np.bincount(hours, weights=weights, minlength=HOURS)
+
+
+def peak(hist: np.ndarray) -> Optional[int]:
+    """Index of the largest bin, or None for an empty/all-zero histogram."""
+    hist = np.asarray(hist)
+    if hist.size == 0 or not hist.any():
+        return None
+    return int(np.argmax(hist))
+
+
+def parse_hour_labels(labels: Sequence[str]) -> np.ndarray:
+    """Vectorized hour parsing ("8 AM", "8AM", "12 PM", "20:00" -> 8, 8, 12, 20); int64 array."""
+    arr = np.asarray(labels, dtype=str)
+    parts = pd.Series(arr.ravel()).str.extract(HOUR_LABEL)
+    if parts[0].isna().any():
+        bad = str(arr.ravel()[parts[0].isna().to_numpy()][0])
+        raise ValueError(f"unrecognised hour label: {bad!r}")
+    hour = parts[0].astype(np.int64).to_numpy()
+    suffix = parts[1].str.upper()
+    hour = np.where(suffix.notna(), hour % 12 + 12 * (suffix == "PM").to_numpy(), hour)
+    return hour.reshape(arr.shape)
+
+
+def hour_label(hour: int) -> str:
+    """Format an hour of day the way the demo data does ("8 AM", "12 PM")."""
+    suffix = "AM" if hour < 12 else "PM"
+    return f"{hour % 12 or 12} {suffix}"
+
+
+class TimestampStore:
+    """Growable int64 array of order timestamps fed from the journal tail."""
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+        self.watermark = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def extend(self, ts) -> None:
+        ts = to_epoch(ts)
+        needed = self.size + ts.size
+        if needed > self._data.size:
+            grown = np.empty(max(needed, 2 * self._data.size), dtype=np.int64)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:needed] = ts
+        self.size = needed
+
+    def refresh(self, path: Path = JOURNAL_PATH) -> int:
+        """Append timestamps of records journaled since the watermark; returns how many."""
+        if self.watermark > journal_size(path):
+            self.size = self.watermark = 0
+        new = []
+        for offset, record in replay(path, self.watermark):
+            new.append(record["ts"])
+            self.watermark = offset
+        if new:
+            self.extend(np.asarray(new, dtype=np.float64))
+        return len(new)
+
+    def since(self, seconds: float, now: Optional[float] = None) -> np.ndarray:
+        """Timestamps within the last ``seconds``."""
+        values = self.values
+        return values[values >= int((now or time.time()) - seconds)]
+
+
+_STORE: Optional[TimestampStore] = None
+_LOCK = threading.Lock()
+
+
+def order_times() -> TimestampStore:
+    """Process-wide store of journaled order timestamps, refreshed on each call."""
+    global _STORE
+    with _LOCK:
+        if _STORE is None:
+            _STORE = TimestampStore()
+        _STORE.refresh()
+        return _STORE
+
+
+def busy_hour_label(fallback: Optional[str] = None, days: int = 28) -> Optional[str]:
+    """Busiest hour of day over the last ``days`` of real orders, else ``fallback``."""
+    hour = peak(hour_histogram(order_times().since(days * SECONDS_PER_DAY)))
+    return hour_label(hour) if hour is not None else fallback
@@ -0,0 +1,100 @@
+"""Bounded-memory streaming top-K (Space-Saving, Metwally et al. 2005).
+
+``SpaceSaving(capacity)`` keeps at most ``capacity`` counters. While the number of
+distinct keys stays within capacity every count is exact; past that, the smallest
+counter is recycled for the new key and its old value is remembered as that key's
+overestimation ``error``. Any key with true weight above ``total / capacity`` is
+guaranteed to be tracked, and each reported count ``c`` satisfies
+``c - error <= true <= c``.
+"""
+import heapq
+from typing import Hashable, List, Mapping, NamedTuple
+
+
+class TopEntry(NamedTuple):
+    key: Hashable
+    count: float
+    error: float
+
+
+class SpaceSaving:
+    """Weighted Space-Saving summary with a lazy min-heap for O(log k) updates."""
+
+    def __init__(self, capacity: int = 64):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.counts: dict = {}
+        self.errors: dict = {}
+        self.total = 0.0
+        self.evictions = 0
+        self._heap: list = []
+
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        self.total += weight
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+            self.errors[key] = 0.0
+        else:
+            floor_key, floor = self._pop_min()
+            del counts[floor_key]
+            del self.errors[floor_key]
+            counts[key] = floor + weight
+            self.errors[key] = floor
+            self.evictions += 1
+        heapq.heappush(self._heap, (counts[key], repr(key), key))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+
+    def _pop_min(self):
+        heap, counts = self._heap, self.counts
+        while True:
+            count, _, key = heapq.heappop(heap)
+            if counts.get(key) == count:
+                return key, count
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(c, repr(k), k) for k, c in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    @property
+    def exact(self) -> bool:
+        """True while no counter has been recycled, i.e. every count is exact."""
+        return self.evictions == 0
+
+    @property
+    def max_error(self) -> float:
+        """Upper bound on any count's overestimation (0 when exact)."""
+        if self.exact:
+            return 0.0
+        return min(self.total / self.capacity, min(self.counts.values()))
+
+    def top(self, n: int) -> List[TopEntry]:
+        """The ``n`` heaviest keys, heaviest first."""
+        best = heapq.nlargest(n, self.counts.items(), key=lambda kv: kv[1])
+        return [TopEntry(k, c, self.errors[k]) for k, c in best]
+
+    def get(self, key: Hashable, default: float = 0.0) -> float:
+        return self.counts.get(key, default)
+
+    def to_state(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "evictions": self.evictions,
+            "counts": [[k, c, self.errors[k]] for k, c in self.counts.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: Mapping) -> "SpaceSaving":
+        summary = cls(int(state.get("capacity", 64)))
+        summary.total = float(state.get("total", 0.0))
+        summary.evictions = int(state.get("evictions", 0))
+        for key, count, error in state.get("counts", []):
+            summary.counts[key] = count
+            summary.errors[key] = error
+        summary._rebuild_heap()
+        return summary